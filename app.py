@@ -1,28 +1,51 @@
+import math
+import os
 import time
-import random
+import tempfile
 import uuid
 import threading
-import queue
+from array import array
+from concurrent.futures import wait
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
 
-from sorting import (
-    bubble_sort,
-    insertion_sort,
-    selection_sort,
-    merge_sort,
-    heap_sort,
-    quick_sort,
-    quick_sort_median3,
-)
-
-from utils import draw_altair_bars, visualize_sorting
+from backend import QueueFull, WorkerBackend, export_job, measure_job, sort_job
+from cache import ResultCache, fingerprint
+from datasets import DISTRIBUTIONS, LABELS, generate
+from canvas import MAX_CANVAS_OPS, canvas_ops, draw_trace_canvas
+from external import external_sort
+from framerate import FrameFanIn, FrameScheduler, shared_fps
+from lod import BINS as LOD_BINS, Envelope
+from metrics import METRICS
+from profiling import Profiler
+from sorting import ALGORITHMS, PARALLEL, WORST_CASE
+from scheduler import UnitResult, WorkUnit, estimate_cost
+from tracer import TraceCursor, TracePlayer
+from utils import RENDERERS, draw_envelope_bars, get_renderer
 
 # --- CONFIG ---
-draw_bar_function = draw_altair_bars
+DEFAULT_RENDERER = "Altair"
 BASE_SPEED = 1e7
 RANGE = 1000
+TARGET_FPS = 30
+# Recorded swaps/writes allowed per animated comparison panel
+TRACE_BUDGET = 2000000
+# Sorts that can go quadratic run in pure Python; past this many elements they may take minutes
+MAX_QUADRATIC_N = 10000
+# Frames in a downloadable animation; longer traces skip operations between frames
+EXPORT_FRAMES = 150
+
+@st.cache_resource
+def worker_backend():
+    # One pool for the whole server: every session's sorts and comparisons queue on it
+    return WorkerBackend()
+
+@st.cache_resource
+def result_cache():
+    # Opened once per server; each call makes its own SQLite connection, so sessions can share it
+    return ResultCache()
 
 # --- UI Setup ---
 st.set_page_config(layout="wide", page_title="Sorting Visualizer")
@@ -37,108 +60,277 @@ if 'original_data' not in st.session_state:
     st.session_state.original_data = None
 if 'speed' not in st.session_state:
     st.session_state.speed = BASE_SPEED  # Initial value, will be updated by slider
-
-# --- Algorithm Options ---
-ALGORITHMS = [
-    "Bubble Sort",
-    "Insertion Sort",
-    "Selection Sort",
-    "Merge Sort",
-    "Heap Sort",
-    "Quick Sort",
-    "Quick Sort (Median of 3)"
-]
+if 'player' not in st.session_state:
+    st.session_state.player = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+SESSION = st.session_state.session_id
+BACKEND = worker_backend()
+RESULT_CACHE = result_cache()
 
 # --- Controls ---
 N_COL, T_COL = st.columns([3, 2], gap="large")
 with N_COL:
-    N = st.slider("Number of Elements: ", 10, 1000, 50, 5)
+    N = st.slider("Number of Elements: ", 10, 100000, 50, 5)
 with T_COL:
     ALGO = st.selectbox("Sorting Algorithm", ALGORITHMS)
 
 A_COL, T_COL = st.columns([2.5, 2], gap="large")
 with A_COL:
     st.markdown("### Data Source")
-    data_option = st.selectbox("Choose Data Source:", [
-        "User Input",
-        "Random Numbers",
-        "Random Ascending Numbers",
-        "Random Descending Numbers"
-    ])
+    data_option = st.selectbox("Choose Data Source:", ["User Input"] + list(DISTRIBUTIONS), format_func=lambda key: LABELS.get(key, key))
     
     # Generate or update arr only if needed
     if data_option == "User Input":
+        streaming = st.checkbox("Streaming mode (sort large files on disk)")
         uploaded_file = st.file_uploader("Upload a text file with numbers (one per line)", type=["txt"])
-        if uploaded_file is not None:
+        if uploaded_file is not None and streaming:
+            # Never materialize the file as a list: sort runs and merge them on disk
+            budget_mb = st.number_input("Memory Budget (MB)", min_value=8, max_value=4096, value=64)
+            st.session_state.arr = None
+            st.session_state.original_data = None
+            st.session_state.player = None
+            if st.button("SORT FILE ON DISK", use_container_width=True):
+                run_name = ALGO if ALGO in ("Merge Sort", "Heap Sort") else "Merge Sort"
+                status = st.empty()
+                bar = st.progress(0.0)
+
+                def report(phase, done, total):
+                    if phase == "run":
+                        status.markdown(f"**Run phase:** sorted and spilled {done} run(s)")
+                    else:
+                        status.markdown(f"**Merge phase:** merged {done:,} of {total:,} numbers")
+                        bar.progress(done / total if total else 1.0)
+
+                previous = st.session_state.get('sorted_path')
+                if previous and os.path.exists(previous):
+                    os.remove(previous)
+                st.session_state.sorted_path = None
+                with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as out:
+                    try:
+                        uploaded_file.seek(0)
+                        stats = external_sort(uploaded_file, out, budget_mb << 20, ALGORITHMS[run_name], progress=report)
+                    except (ValueError, OverflowError):
+                        # A non-integer line, or a value too large for the int64 run files
+                        stats = None
+                if stats is None:
+                    os.remove(out.name)
+                    st.error("File must contain valid integers, one per line.")
+                else:
+                    st.session_state.sorted_path = out.name
+                    status.markdown(
+                        f"Sorted **{stats.items:,}** numbers in **{stats.runs}** run(s) of up to "
+                        f"{stats.run_length:,} with {run_name} in {stats.seconds:.2f}s"
+                    )
+            sorted_path = st.session_state.get('sorted_path')
+            if sorted_path and os.path.exists(sorted_path):
+                with open(sorted_path, "rb") as sorted_file:
+                    st.download_button(
+                        label="Download Sorted Data",
+                        data=sorted_file,
+                        file_name="sorted_data.txt",
+                        mime="text/plain",
+                        key="streamed_sorted_download"
+                    )
+        elif uploaded_file is not None:
             try:
                 # Read numbers from file
                 numbers = uploaded_file.read().decode("utf-8").strip().split("\n")
-                new_arr = [int(num) for num in numbers if num.strip()]
+                new_arr = array('q', (int(num) for num in numbers if num.strip()))
                 # Update session state only if new file is uploaded
                 st.session_state.arr = new_arr
-                st.session_state.original_data = "\n".join(str(x) for x in new_arr)
-            except ValueError:
+                st.session_state.original_data = array('q', new_arr)
+                st.session_state.player = None
+            except (ValueError, OverflowError):
                 st.error("File must contain valid integers, one per line.")
                 st.session_state.arr = None
                 st.session_state.original_data = None
+                st.session_state.player = None
     elif st.session_state.arr is None or st.session_state.get('last_data_option') != data_option:
         # Generate new data for random options only if no data exists or option changed
-        if data_option == "Random Numbers":
-            st.session_state.arr = [random.randint(1, RANGE) for _ in range(N)]
-        elif data_option == "Random Ascending Numbers":
-            st.session_state.arr = sorted([random.randint(1, RANGE) for _ in range(N)])
-        elif data_option == "Random Descending Numbers":
-            st.session_state.arr = sorted([random.randint(1, RANGE) for _ in range(N)], reverse=True)
-        st.session_state.original_data = "\n".join(str(x) for x in st.session_state.arr)
+        values = generate(data_option, N, seed=int(np.random.default_rng().integers(1 << 32)), high=RANGE)
+        # Typed contiguous buffers: 8 bytes per element instead of a boxed int
+        st.session_state.arr = array('q', values.tobytes())
+        st.session_state.original_data = array('q', st.session_state.arr)
         st.session_state.last_data_option = data_option
+        st.session_state.player = None
 
     # Reset button
     if st.button("Reset Data"):
         st.session_state.arr = None
         st.session_state.original_data = None
+        st.session_state.player = None
         st.session_state.pop('last_data_option', None)
 
     animate_option = st.selectbox("Enable Sorting Animation", ["Yes", "No"])
     animate = animate_option == "Yes"
+    # Canvas animates the recorded trace in the browser; Altair redraws from the server
+    renderer_option = st.selectbox("Animation Renderer", [DEFAULT_RENDERER, "Canvas"] + [name for name in RENDERERS if name != DEFAULT_RENDERER])
+    use_canvas = renderer_option == "Canvas"
+    # Still frames are drawn by a bar renderer even when the canvas animates
+    draw_bar_function = get_renderer(DEFAULT_RENDERER if use_canvas else renderer_option)
+    offer_gif = st.checkbox("Offer the animation as a GIF download")
+    profile_runs = st.checkbox("Profile runs (time per phase, cProfile and sampled lines)")
+
+def too_slow(name, n):
+    return WORST_CASE[name] == "O(n²)" and n > MAX_QUADRATIC_N
+
+def show_profile(profiler, name):
+    profiler.stop_sampling()
+    with st.expander("Profile", expanded=True):
+        st.markdown("**Time per phase**")
+        st.dataframe(pd.DataFrame([
+            {"Phase": p.phase, "Seconds": round(p.seconds, 3), "Calls": p.calls, "Share": f"{p.share:.0%}"}
+            for p in profiler.report()
+        ]), use_container_width=True)
+        st.markdown(f"**Hottest lines** ({profiler.samples} samples of the script thread)")
+        st.dataframe(pd.DataFrame([
+            {"Line": h.location, "Function": h.function, "Samples": h.samples, "Share": f"{h.share:.0%}"}
+            for h in profiler.hot_lines()
+        ]), use_container_width=True)
+        for key in profiler.stats:
+            st.markdown(f"**cProfile: {key}**")
+            st.code(profiler.top_functions(key), language="text")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "profile.json")
+            profiler.save(path)
+            with open(path, "rb") as f:
+                st.download_button("Download Profile (JSON)", f.read(), file_name=f"profile-{name}.json", mime="application/json")
+
+def pool_status():
+    u = BACKEND.utilization()
+    return (
+        f"Worker pool: {u.busy}/{u.workers} busy · {u.queued} queued · {u.sessions} active session(s) · "
+        f"{u.utilization:.0%} utilized over the last minute · {u.deduplicated} duplicate job(s) shared"
+    )
+
+def submit_all(jobs, profile=False):
+    """Submit ``{name: (func, *args)}`` to the worker pool; None (after a warning) if it is full."""
+    try:
+        return {name: BACKEND.submit(SESSION, *job, profile=profile) for name, job in jobs.items()}
+    except QueueFull as e:
+        BACKEND.discard(SESSION)
+        st.warning(f"The worker pool is busy: {e}.")
+        return None
+
+def wait_for(futures, status):
+    """Block until every future is done, showing the pool's utilization meanwhile."""
+    pending = set(futures)
+    try:
+        while pending:
+            status.caption(pool_status())
+            _, pending = wait(pending, timeout=0.25)
+    finally:
+        # A rerun interrupts the wait; drop the jobs nobody is waiting for any more
+        if pending:
+            BACKEND.discard(SESSION)
+    status.caption(pool_status())
+
+def sort_failed(name, error, profiler):
+    """Show why a single sort raised, e.g. Counting Sort on too wide a key range, and end the run."""
+    profiler.stop_sampling()
+    st.error(f"{name} failed on this input ({error!r}).")
+    st.stop()
+
+def run_sort(name, values, record, profiler, status):
+    """``sort_job`` on the worker pool, or in this thread when the pool is full."""
+    futures = submit_all({name: (sort_job, name, values, record)}, profiler.enabled)
+    try:
+        if futures is None:
+            # Rather than refuse, sort in this session's own thread
+            with profiler.phase("compute", profile=name):
+                return sort_job(name, values, record)
+        with profiler.phase("compute"):
+            wait_for(futures.values(), status)
+        job = futures[name].result()
+    except Exception as e:
+        sort_failed(name, e, profiler)
+    profiler.add_unit(name, job.profile)
+    return job.value
+
+def renderer_for(n):
+    # Past one bar per column, draw each column's min/max envelope instead
+    return draw_bar_function if n <= LOD_BINS else get_renderer("Altair (LOD)")
 
 with T_COL:
     slider_value = st.slider("Speed: ", 1, 10, 5)
     exponent = -7.0 + (slider_value - 1) * 6 / 9
     st.session_state.speed = BASE_SPEED * (10 ** exponent)
+    # A time budget overrides the speed so every animation ends on time
+    budget = st.slider("Animation Time Budget (seconds, 0 = follow speed): ", 0, 60, 0)
+    duration = budget or None
 
 # --- Initial plot ---
 plot_spot = st.empty()
-if st.session_state.arr is not None:
-    draw_bar_function(st.session_state.arr, plot_spot)
+player = st.session_state.player
+if st.session_state.arr is not None and player is not None and len(player) > 0:
+    # Scrub through the last recorded sort without running it again
+    replay_step = st.slider("Replay Step: ", 0, len(player), len(player))
+    player.seek(replay_step)
+    renderer_for(len(player.arr))(player.arr, plot_spot, player.highlight)
+elif st.session_state.arr is not None:
+    renderer_for(len(st.session_state.arr))(st.session_state.arr, plot_spot)
 
 # --- Single sort execution ---
-if st.session_state.arr is not None and st.button("SORT!", use_container_width=True):
-    sort_func_map = {
-        "Bubble Sort": bubble_sort,
-        "Insertion Sort": insertion_sort,
-        "Selection Sort": selection_sort,
-        "Merge Sort": merge_sort,
-        "Heap Sort": heap_sort,
-        "Quick Sort": quick_sort,
-        "Quick Sort (Median of 3)": quick_sort_median3,
-    }
-
-    sort_func = sort_func_map[ALGO]
-    arr, time_c, space_c = sort_func(
-        st.session_state.arr,
-        st.session_state.speed,
-        visualization=animate,
-        plot_spot=plot_spot,
-        draw_func=draw_bar_function,
-        beep_func=None,
-    )
+sort_clicked = st.session_state.arr is not None and st.button("SORT!", use_container_width=True)
+if sort_clicked and too_slow(ALGO, len(st.session_state.arr)):
+    st.warning(f"{ALGO} is O(n²) in the worst case and could take minutes on {len(st.session_state.arr):,} elements; pick N ≤ {MAX_QUADRATIC_N:,} or use cli.py.")
+elif sort_clicked:
+    sort_func = ALGORITHMS[ALGO]
+    frame_stats = None
+    profiler = Profiler(enabled=profile_runs)
+    profiler.start_sampling()
+    if ALGO in PARALLEL and not animate:
+        # Nothing to replay, so skip the trace and let the sort use every core
+        sort_start = time.perf_counter()
+        try:
+            with profiler.phase("compute", profile=ALGO):
+                arr, time_c, space_c = sort_func(st.session_state.arr)
+        except Exception as e:
+            sort_failed(ALGO, e, profiler)
+        st.caption(f"Sorted in {time.perf_counter() - sort_start:.2f}s with up to {os.cpu_count() or 1} worker processes; no replay was recorded")
+        counts = trace = player = None
+    else:
+        # Record the operations once at full speed on a worker, then replay them.
+        # As in the comparison view, a sort that may exceed the trace budget
+        # first runs with counters only, and then a prefix that fits is recorded.
+        n = len(st.session_state.arr)
+        record_now = n * (n - 1) // 2 <= TRACE_BUDGET
+        pool_spot = st.empty()
+        arr, time_c, space_c, counts = run_sort(ALGO, st.session_state.arr, record_now, profiler, pool_spot)
+        trace = counts if record_now else None
+        if trace is None:
+            ops = counts.swaps + counts.writes
+            shown = n if ops <= TRACE_BUDGET else max(2, int(n * math.sqrt(TRACE_BUDGET / ops)))
+            trace = run_sort(ALGO, st.session_state.arr[:shown], True, profiler, pool_spot)[3]
+            if shown < n:
+                st.caption(f"Animating the first {shown:,} of {n:,} elements; the whole sort takes {ops:,} swaps and writes")
+        player = TracePlayer(trace)
+    on_canvas = animate and use_canvas and canvas_ops(trace) <= MAX_CANVAS_OPS
+    if animate and use_canvas and not on_canvas:
+        st.caption(f"The trace is too long to send to the browser ({canvas_ops(trace):,} operations); drawing it from the server instead")
+    if on_canvas:
+        with profiler.phase("draw"):
+            draw_trace_canvas(trace, plot_spot, st.session_state.speed, duration=duration)
+    elif animate:
+        scheduler = FrameScheduler(duration, st.session_state.speed, TARGET_FPS, sleep=profiler.timed("sleep", time.sleep))
+        frame_stats = scheduler.play(player, plot_spot, profiler.timed("draw", renderer_for(len(player.arr))))
 
     st.session_state.arr = arr  # Update stored array
-    draw_bar_function(arr, plot_spot)
+    st.session_state.player = player
+    if not on_canvas:
+        with profiler.phase("draw"):
+            renderer_for(len(arr))(arr, plot_spot)
+    if frame_stats is not None:
+        st.caption(
+            f"{frame_stats.frames} frames in {frame_stats.seconds:.2f}s "
+            f"({frame_stats.fps:.1f} fps, {frame_stats.ops_per_frame:.1f} ops/frame, "
+            f"{frame_stats.mean_frame_ms:.1f} ms mean / {frame_stats.max_frame_ms:.1f} ms max draw)"
+        )
     # Original Data download
     st.download_button(
         label="Download Original Data",
-        data=st.session_state.original_data,
+        data="\n".join(map(str, st.session_state.original_data)),
         file_name="original_data.txt",
         mime="text/plain"
     )
@@ -151,142 +343,247 @@ if st.session_state.arr is not None and st.button("SORT!", use_container_width=T
         mime="text/plain",
         key="sorted_download_updated"
     )
-    time.sleep(0.5)
+    if offer_gif and trace is not None:
+        # Pre-rendered off-screen from the trace on the worker pool, so it can be shared without re-running the sort
+        step = max(1, -(-len(trace) // EXPORT_FRAMES))
+        futures = submit_all({ALGO: (export_job, trace, ALGO, step)})
+        with profiler.phase("export"):
+            if futures is None:
+                # As with the sort itself, render in this thread rather than refuse
+                gif = export_job(trace, ALGO, step)
+            else:
+                wait_for(futures.values(), pool_spot)
+                gif = futures[ALGO].result().value
+        st.download_button("Download Animation (GIF)", gif, file_name="animation.gif", mime="image/gif")
+    with profiler.phase("sleep"):
+        time.sleep(0.5)
     st.markdown("### Complexity Analysis")
     st.markdown(f"**Loop Count (Approximate Time Complexity):** `{time_c}`")
     st.markdown(f"**Temporary Space Used (Space Complexity):** `{space_c}`")
+    if counts is not None:
+        st.markdown(
+            f"**Comparisons:** `{counts.comparisons}` · **Swaps:** `{counts.swaps}` · "
+            f"**Writes:** `{counts.writes}` · **Max Recursion Depth:** `{counts.max_depth}`"
+        )
+    if profile_runs:
+        show_profile(profiler, "sort")
 
 # --- Sort using all algorithms ---
 if st.session_state.arr is not None and st.button("SORT USING ALL ALGORITHMS", use_container_width=True):
-    algorithms = {
-        "Bubble Sort": bubble_sort,
-        "Insertion Sort": insertion_sort,
-        "Selection Sort": selection_sort,
-        "Merge Sort": merge_sort,
-        "Heap Sort": heap_sort,
-        "Quick Sort": quick_sort,
-        "Quick Sort (Median of 3)": quick_sort_median3,
-    }
+    algorithms = ALGORITHMS
 
     algo_names = list(algorithms.keys())
-    # Use the same input array (user-provided or random based on data_option)
-    arr_for_visual = st.session_state.arr.copy()
-    if len(arr_for_visual) > 500:
-        arr_for_visual = arr_for_visual[:500]
+    n = len(st.session_state.arr)
+    skipped = [name for name in algo_names if too_slow(name, n)]
+    if skipped:
+        st.info(f"Skipped on {n:,} elements (worst case O(n²) in pure Python): {', '.join(skipped)}")
+    algo_names = [name for name in algo_names if name not in skipped]
+    profiler = Profiler(enabled=profile_runs)
+    profiler.start_sampling()
+
+    # Each algorithm runs once on the shared worker pool: the counts feed the
+    # charts. Small inputs fit the trace budget for every algorithm, so their
+    # traces are recorded in the same pass.
+    record_now = animate and n * (n - 1) // 2 <= TRACE_BUDGET
+    outcome = {}
+    digest = fingerprint(st.session_state.arr)
+    if not profile_runs:
+        # A profiled run has to happen; otherwise a cached record stands in for
+        # the measurement, and only the trace, if any, is recorded anew
+        hits = RESULT_CACHE.get_many(RESULT_CACHE.key(name, digest) for name in algo_names)
+        for name in algo_names:
+            hit = hits.get(RESULT_CACHE.key(name, digest))
+            if hit is not None and hit.comparisons is not None:
+                outcome[name] = UnitResult(hit, None)
+    # Queued longest first, so the slowest algorithm is not the last to start
+    pending = sorted(
+        (name for name in algo_names if name not in outcome or record_now),
+        key=lambda name: estimate_cost(WorkUnit(name, n, None, 0)), reverse=True,
+    )
+    futures = submit_all({
+        name: (sort_job, name, st.session_state.arr, True) if name in outcome
+        else (measure_job, name, st.session_state.arr, record_now)
+        for name in pending
+    }, profile_runs)
+    if futures is None:
+        st.stop()
+    pool_spot = st.empty()
+    with profiler.phase("run units"):
+        wait_for(futures.values(), pool_spot)
+    failed = [name for name, future in futures.items() if future.exception() is not None]
+    for name in failed:
+        st.warning(f"{name} failed on this input ({futures[name].exception()!r}) and is left out.")
+    algo_names = [name for name in algo_names if name not in failed]
+    RESULT_CACHE.put_many({
+        RESULT_CACHE.key(name, digest): futures[name].result().value.record
+        for name in futures if name not in failed and name not in outcome
+    })
+
+    results = {}
+    traces = {}
+    for name in algo_names:
+        if name in futures:
+            job = futures[name].result()
+            if name in outcome:
+                # The record came from the cache; this job only recorded the trace
+                outcome[name] = outcome[name]._replace(trace=job.value[3])
+            else:
+                outcome[name] = job.value
+            profiler.add_unit(name, job.profile)
+        results[name] = outcome[name].record
+        traces[name] = outcome[name].trace
+
+    if animate and not record_now:
+        # Animate the whole array unless the trace would exceed the budget;
+        # then animate the longest prefix whose trace should fit
+        visual_sizes = {}
+        for name in algo_names:
+            ops = results[name].swaps + results[name].writes
+            visual_sizes[name] = n if ops <= TRACE_BUDGET else max(2, int(n * math.sqrt(TRACE_BUDGET / ops)))
+        futures = submit_all({
+            name: (sort_job, name, st.session_state.arr[:visual_sizes[name]], True)
+            for name in algo_names
+        })
+        if futures is None:
+            st.stop()
+        with profiler.phase("record traces"):
+            wait_for(futures.values(), pool_spot)
+        for name in algo_names:
+            traces[name] = futures[name].result().value[3]
 
     if animate:
         st.markdown("### 🔄 Visual Comparison (Animated)")
 
         all_placeholders = []
-        plot_queues = []
-        last_drawn = [None] * len(algorithms)
 
         algo_index = 0
-        for row in range(4):
+        for row in range((len(algo_names) + 1) // 2):
             cols = st.columns(2)
             for col in cols:
                 if algo_index < len(algo_names):
                     col.markdown(f"### {algo_names[algo_index]}")
+                    shown = len(traces[algo_names[algo_index]].initial)
+                    if shown < n:
+                        col.caption(f"Animating the first {shown:,} of {n:,} elements")
                     chart_area = col.empty()
                     all_placeholders.append({
                         "chart": chart_area
                     })
-                    plot_queues.append(queue.Queue())
                     algo_index += 1
 
-
-        def run_sort_thread(func, q, arr_copy, speed_value):
-            def custom_draw(arr_frame, plot_spot, hi):
-                q.put((arr_frame.copy(), hi))
-
-            func(
-                arr_copy,
-                speed_value,  # Pass speed explicitly
-                visualization=True,
-                plot_spot=q,
-                draw_func=custom_draw,
-                beep_func=None,
-            )
-            q.put("__DONE__")
-
-        threads = []
-        current_speed = st.session_state.speed  # Snapshot current speed
-        for i, (name, func) in enumerate(algorithms.items()):
-            # all_placeholders[i]["title"].markdown(f"### {name}")
-            arr_clone = arr_for_visual.copy()
-            t = threading.Thread(
-                target=run_sort_thread,
-                args=(func, plot_queues[i], arr_clone, current_speed)
+        shipped = sum(canvas_ops(traces[name]) for name in algo_names) if use_canvas else 0
+        if use_canvas and shipped > MAX_CANVAS_OPS:
+            st.caption(f"The traces are too long to send to the browser ({shipped:,} operations); drawing them from the server instead")
+        if use_canvas and shipped <= MAX_CANVAS_OPS:
+            # Every panel animates client-side; nothing is left for the server to draw
+            for i, name in enumerate(algo_names):
+                with profiler.phase("draw"):
+                    draw_trace_canvas(traces[name], all_placeholders[i]["chart"], st.session_state.speed, duration=duration)
+        else:
+            # The panels share one drawing thread: they start at the full frame
+            # rate, which is lowered to what the measured draw cost allows
+            scheduler = FrameScheduler(
+                duration, st.session_state.speed, TARGET_FPS,
+                sleep=profiler.timed("sleep (producers)", time.sleep),
             )
-            threads.append(t)
-            t.start()
+            frame_stats = {}
+            draw_ms = [[] for _ in algo_names]
+            draw_total, draws = 0.0, 0
+
+            fan_in = FrameFanIn(len(algo_names))
 
-        completed = [False] * len(algorithms)
-        while not all(completed):
-            for i, q in enumerate(plot_queues):
+            def run_player_thread(index, name, trace):
+                # Only the step number is published; the script thread owns the array
+                cursor = TraceCursor(trace)
                 try:
-                    msg = q.get_nowait()
-                    if msg == "__DONE__":
-                        completed[i] = True
-                        continue
-                    arr_frame, hi = msg
-                    if last_drawn[i] != arr_frame:
-                        draw_bar_function(arr_frame, all_placeholders[i]["chart"], hi)
-                        last_drawn[i] = arr_frame
-                except queue.Empty:
-                    continue
-            time.sleep(0.015)
-
-        for t in threads:
-            t.join()
+                    frame_stats[name] = scheduler.play(
+                        cursor, None, lambda arr, spot, hi: fan_in.publish(index, cursor.position), stop=fan_in.stop
+                    )
+                finally:
+                    fan_in.close(index)
+
+            threads = []
+            for i, name in enumerate(algo_names):
+                t = threading.Thread(target=run_player_thread, args=(i, name, traces[name]), daemon=True)
+                threads.append(t)
+                t.start()
+
+            players = [TracePlayer(traces[name]) for name in algo_names]
+            # Large panels send a fixed number of min/max columns, updated per touched bin
+            envelopes = [Envelope(player) if len(player.arr) > LOD_BINS else None for player in players]
+            try:
+                # Sleeps until some panel has a new position; a rerun raised by a
+                # widget change lands in the finally block and stops the producers
+                collect = profiler.timed("queue wait", fan_in.collect)
+                while (frames := collect()) is not None:
+                    for i, position in frames.items():
+                        with profiler.phase("replay"):
+                            players[i].seek(position)
+                        draw_start = time.perf_counter()
+                        if envelopes[i] is None:
+                            draw_bar_function(players[i].arr, all_placeholders[i]["chart"], players[i].highlight)
+                        else:
+                            envelope = envelopes[i]
+                            envelope.update()
+                            highlight = players[i].highlight
+                            draw_envelope_bars(
+                                envelope.mins, envelope.maxs, all_placeholders[i]["chart"],
+                                None if highlight is None else envelope.bin_of(highlight),
+                            )
+                        draw_seconds = time.perf_counter() - draw_start
+                        draw_ms[i].append(1000 * draw_seconds)
+                        profiler.add("draw", draw_seconds)
+                        draw_total += draw_seconds
+                        draws += 1
+                    scheduler.fps = shared_fps(draw_total / draws, len(algo_names), TARGET_FPS)
+            finally:
+                fan_in.cancel()
+                for t in threads:
+                    t.join()
+
+            with st.expander("Frame Telemetry"):
+                st.dataframe(pd.DataFrame([
+                    {
+                        "Algorithm": name,
+                        "Frames": frame_stats[name].frames,
+                        "Ops/Frame": round(frame_stats[name].ops_per_frame, 1),
+                        "Seconds": round(frame_stats[name].seconds, 2),
+                        "FPS": round(frame_stats[name].fps, 1),
+                        "Mean Draw (ms)": round(sum(draw_ms[i]) / len(draw_ms[i]), 1) if draw_ms[i] else 0.0,
+                    }
+                    for i, name in enumerate(algo_names)
+                ]), use_container_width=True)
 
     # --- Complexity Comparison ---
     st.markdown("## 📊 Complexity Comparison")
 
-    results = {}
-    for name, func in algorithms.items():
-        test_arr = st.session_state.arr.copy()  # Use the same input data
-        sorted_arr, loop_count, space_count = func(
-            test_arr,
-            speed=1e12,
-            visualization=False,
-            plot_spot=None,
-            draw_func=None,
-            beep_func=None,
-        )
-        results[name] = {
-            "time": loop_count,
-            "space": space_count,
-        }
-
-    time_vals = [results[algo]["time"] for algo in algo_names]
-    space_vals = [results[algo]["space"] for algo in algo_names]
-
     def get_colors(values):
-        min_val, max_val = min(values), max(values)
+        # Peak memory is None where tracemalloc would have been too slow
+        measured = [v for v in values if v is not None]
+        min_val, max_val = min(measured, default=None), max(measured, default=None)
         return [
             'green' if v == min_val else 'red' if v == max_val else 'lightgray'
             for v in values
         ]
 
+    def metric_figure(field):
+        values = [getattr(results[algo], field) for algo in algo_names]
+        labels = ["n/a" if v is None else f"{v:.3g}" if isinstance(v, float) else v for v in values]
+        return go.Figure(
+            data=[go.Bar(
+                x=algo_names, y=values, marker_color=get_colors(values),
+                text=labels, textposition="outside"
+            )],
+            layout=go.Layout(title=METRICS[field], height=400)
+        )
 
-    time_colors = get_colors(time_vals)
-    space_colors = get_colors(space_vals)
+    st.plotly_chart(metric_figure("loops"), use_container_width=True)
+    st.plotly_chart(metric_figure("space"), use_container_width=True)
 
-    fig_time = go.Figure(
-        data=[go.Bar(
-            x=algo_names, y=time_vals, marker_color=time_colors,
-            text=time_vals, textposition="outside"
-        )],
-        layout=go.Layout(title="Loop Count (Time Complexity)", height=400)
-    )
-    st.plotly_chart(fig_time, use_container_width=True)
-
-    fig_space = go.Figure(
-        data=[go.Bar(
-            x=algo_names, y=space_vals, marker_color=space_colors,
-            text=space_vals, textposition="outside"
-        )],
-        layout=go.Layout(title="Temporary Space Used (Space Complexity)", height=400)
-    )
-    st.plotly_chart(fig_space, use_container_width=True)
\ No newline at end of file
+    # Uniform instrumentation of every run, comparable across algorithms
+    st.markdown("### 🔬 Instrumentation")
+    fields = [field for field in METRICS if field not in ("loops", "space")]
+    for tab, field in zip(st.tabs([METRICS[field] for field in fields]), fields):
+        tab.plotly_chart(metric_figure(field), use_container_width=True)
+    if profile_runs:
+        show_profile(profiler, "comparison")
@@ -0,0 +1,230 @@
+import cProfile
+import os
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import Future
+from functools import partial
+
+import numpy as np
+
+from cache import fingerprint
+from export import export_animation
+from profiling import raw_stats
+from scheduler import UnitProfile, UnitResult, _context, evaluate
+from sorting import ALGORITHMS
+from tracer import Counter as OpCounter, Trace
+
+# Jobs one session may have queued or running at once
+MAX_SESSION_JOBS = 64
+# Jobs all sessions together may have waiting for a worker
+MAX_QUEUED = 512
+# Seconds of history behind the utilization figure
+WINDOW = 60.0
+
+# What a job's Future resolves to: the job function's return value, plus a
+# UnitProfile when the job was submitted with profile=True
+JobResult = namedtuple("JobResult", ["value", "profile"])
+Utilization = namedtuple("Utilization", [
+    "workers",       # worker processes
+    "busy",          # workers running a job right now
+    "queued",        # jobs waiting for a worker
+    "sessions",      # sessions with a job queued or running
+    "completed",     # jobs finished since start
+    "deduplicated",  # submissions answered by a job already queued or running
+    "rejected",      # submissions refused by a queue limit
+    "utilization",   # share of worker time spent on jobs over the last WINDOW seconds
+])
+
+class QueueFull(RuntimeError):
+    """A session, or the backend as a whole, has too many jobs waiting."""
+
+# --- Worker side ---
+def sort_job(algorithm, values, record=False):
+    """Sort a copy of ``values``; returns ``(sorted array('q'), loops, space, counts)``.
+
+    ``counts`` is the run's Trace when ``record`` is set, and otherwise a
+    tracer.Counter with the same operation counts but no log of the steps.
+    """
+    arr = array("q", values)
+    counts = Trace(arr, record_compares=False) if record else OpCounter()
+    arr, loops, space = ALGORITHMS[algorithm](arr, trace=counts)
+    return arr, loops, space, counts
+
+def measure_job(algorithm, values, record=False, instrument=True):
+    """The UnitResult of ``algorithm`` on ``values``, as run_units would compute it."""
+    trace = Trace(values, record_compares=False) if record else None
+    return UnitResult(evaluate(algorithm, np.asarray(values, dtype=np.int64), instrument, trace), trace)
+
+def export_job(trace, title, step):
+    """The GIF of ``trace`` as bytes, every ``step`` operations one frame.
+
+    Pool workers are daemons and cannot start processes, so the frames are
+    rasterized in the worker itself.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "animation.gif")
+        export_animation([trace], path, step, titles=[title], processes=1)
+        with open(path, "rb") as f:
+            return f.read()
+
+def _run(func, args, profile):
+    if not profile:
+        return JobResult(func(*args), None)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    value = profiler.runcall(func, *args)
+    # transfer carries the send time until the parent receives the result
+    return JobResult(value, UnitProfile(raw_stats(profiler), time.perf_counter() - start, time.time()))
+
+# --- Parent side ---
+def _key(arg):
+    # Inputs are identified by content, so equal arrays from different sessions match
+    if isinstance(arg, (array, list, np.ndarray)):
+        return ("data", fingerprint(arg))
+    return arg
+
+class _Job:
+    def __init__(self, key, session, func, args, profile):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.profile = profile
+        self.sessions = {session}
+        self.future = Future()
+        self.started = None
+
+class WorkerBackend:
+    """One process pool shared by every session of the app.
+
+    ``submit`` queues a job function for a worker and returns a Future of
+    its JobResult. A job identical to one already queued or running, i.e.
+    the same function and options on an input with the same fingerprint,
+    shares that job's Future instead of running twice. Every session has its
+    own queue, and a free worker takes the next job from the next session in
+    turn, so one session's batch cannot starve another's single sort. A
+    session may hold at most ``max_session_jobs`` jobs and the backend at
+    most ``max_queued`` waiting ones; past either, ``submit`` raises
+    QueueFull.
+
+    Workers are forked on first use and are daemons, so the parallel sorts
+    run on one process inside them.
+    """
+
+    def __init__(self, processes=None, max_session_jobs=MAX_SESSION_JOBS, max_queued=MAX_QUEUED):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_session_jobs = max_session_jobs
+        self.max_queued = max_queued
+        self.completed = self.deduplicated = self.rejected = 0
+        self._pool = None
+        self._lock = threading.Lock()
+        self._queues = OrderedDict()  # session -> its waiting jobs, sessions in turn order
+        self._jobs = {}               # key -> job, while queued or running
+        self._held = Counter()        # session -> its jobs queued or running
+        self._running = set()
+        self._history = deque()       # (start, end) of jobs finished within WINDOW
+        self._created = time.perf_counter()
+
+    def submit(self, session, func, *args, profile=False):
+        key = (func.__module__, func.__qualname__, tuple(_key(arg) for arg in args), profile)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self.deduplicated += 1
+                if session not in job.sessions:
+                    job.sessions.add(session)
+                    self._held[session] += 1
+                return job.future
+            if self._held[session] >= self.max_session_jobs:
+                self.rejected += 1
+                raise QueueFull(f"this session already has {self.max_session_jobs} jobs in the worker pool")
+            if sum(len(queue) for queue in self._queues.values()) >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull(f"the worker pool already has {self.max_queued} jobs waiting")
+            job = _Job(key, session, func, args, profile)
+            self._jobs[key] = job
+            self._held[session] += 1
+            self._queues.setdefault(session, deque()).append(job)
+            self._dispatch()
+        return job.future
+
+    def discard(self, session):
+        """Drop ``session``'s waiting jobs that no other session shares, e.g. after a rerun."""
+        cancelled = []
+        with self._lock:
+            for job in self._queues.pop(session, ()):
+                job.sessions.discard(session)
+                self._held[session] -= 1
+                if job.sessions:
+                    # Another session waits on it too; queue it under that session instead
+                    self._queues.setdefault(next(iter(job.sessions)), deque()).append(job)
+                else:
+                    del self._jobs[job.key]
+                    cancelled.append(job.future)
+            if session in self._held and self._held[session] <= 0:
+                del self._held[session]
+        for future in cancelled:
+            future.cancel()
+
+    def utilization(self):
+        now = time.perf_counter()
+        start = now - WINDOW
+        with self._lock:
+            while self._history and self._history[0][1] < start:
+                self._history.popleft()
+            busy = sum(end - max(began, start) for began, end in self._history)
+            busy += sum(now - max(job.started, start) for job in self._running)
+            span = min(WINDOW, now - self._created)
+            return Utilization(
+                self.processes, len(self._running), sum(len(queue) for queue in self._queues.values()),
+                len(self._held), self.completed, self.deduplicated, self.rejected,
+                busy / (self.processes * span) if span > 0 else 0.0,
+            )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _dispatch(self):
+        # Called with the lock held: hand out jobs while workers are free, one session at a time
+        while self._queues and len(self._running) < self.processes:
+            session, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            if self._pool is None:
+                self._pool = _context().Pool(self.processes)
+            job.started = time.perf_counter()
+            self._running.add(job)
+            self._pool.apply_async(
+                _run, (job.func, job.args, job.profile),
+                callback=partial(self._finish, job), error_callback=partial(self._fail, job),
+            )
+
+    def _retire(self, job):
+        with self._lock:
+            self._running.discard(job)
+            del self._jobs[job.key]
+            for session in job.sessions:
+                self._held[session] -= 1
+                if self._held[session] <= 0:
+                    del self._held[session]
+            self._history.append((job.started, time.perf_counter()))
+            self.completed += 1
+            self._dispatch()
+
+    def _finish(self, job, result):
+        if result.profile is not None:
+            result = result._replace(profile=result.profile._replace(transfer=time.time() - result.profile.transfer))
+        self._retire(job)
+        job.future.set_result(result)
+
+    def _fail(self, job, error):
+        self._retire(job)
+        job.future.set_exception(error)
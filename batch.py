@@ -0,0 +1,219 @@
+from functools import lru_cache
+
+import numpy as np
+
+from sorting import (
+    MAX_COUNTING_RANGE,
+    RADIX,
+    RADIX_BITS,
+    bubble_sort,
+    insertion_sort,
+    selection_sort,
+    merge_sort,
+    heap_sort,
+    counting_sort,
+    radix_sort,
+    bucket_sort,
+)
+
+# Each engine takes a (K, n) integer matrix holding K independent inputs and
+# returns (sorted_batch, loop_counts, space_counts) with one counter per row,
+# matching what the scalar function in sorting.py returns for that row.
+
+def _pairs(n):
+    return n * (n - 1) // 2
+
+def _bubble(batch):
+    K, n = batch.shape
+    # Bubble sort visits every (i, j) pair regardless of the data
+    loops = np.full(K, _pairs(n), dtype=np.int64)
+    return np.sort(batch, axis=1), loops, np.zeros(K, dtype=np.int64)
+
+def _selection(batch):
+    K, n = batch.shape
+    loops = np.full(K, _pairs(n), dtype=np.int64)
+    return np.sort(batch, axis=1), loops, np.zeros(K, dtype=np.int64)
+
+def _insertion(batch):
+    # Insertion sort performs exactly one swap per inversion. Inversions are
+    # counted with a bottom-up merge of runs over every row at once.
+    K, n = batch.shape
+    loops = np.zeros(K, dtype=np.int64)
+    if n < 2:
+        return batch.copy(), loops, np.zeros(K, dtype=np.int64)
+
+    # Dense ranks keep composite keys small enough for int64
+    _, ranks = np.unique(batch, return_inverse=True)
+    ranks = ranks.reshape(K, n).astype(np.int64)
+    span = int(ranks.max()) + 2
+
+    size = 1 << (n - 1).bit_length()
+    work = np.full((K, size), span - 1, dtype=np.int64)  # padding sorts last
+    work[:, :n] = ranks
+
+    width = 1
+    while width < size:
+        blocks = work.reshape(K, size // (2 * width), 2, width)
+        left = blocks[:, :, 0, :]
+        right = blocks[:, :, 1, :]
+        groups = np.arange(K * (size // (2 * width)), dtype=np.int64).reshape(K, -1, 1)
+        left_keys = (groups * span + left).ravel()
+        right_keys = (groups * span + right).ravel()
+        not_greater = np.searchsorted(left_keys, right_keys, side='right')
+        not_greater -= np.repeat(groups.ravel() * width, width)
+        loops += (width - not_greater).reshape(K, -1).sum(axis=1)
+        work = np.sort(blocks.reshape(K, -1, 2 * width), axis=2).reshape(K, size)
+        width *= 2
+
+    return np.sort(batch, axis=1), loops, np.zeros(K, dtype=np.int64)
+
+@lru_cache(maxsize=None)
+def _merge_counts(n):
+    # Bottom-up merge sort writes every element of every merged range once and
+    # copies every left run once; neither depends on the data
+    loops = space = 0
+    width = 1
+    while width < n:
+        merges = (n + width - 1) // (2 * width)
+        # The merged ranges tile the array up to the end of the last one
+        loops += min(merges * 2 * width, n)
+        space += merges * width
+        width *= 2
+    return loops, space
+
+def _merge(batch):
+    K, n = batch.shape
+    loops, space = _merge_counts(n)
+    return (
+        np.sort(batch, axis=1),
+        np.full(K, loops, dtype=np.int64),
+        np.full(K, space, dtype=np.int64),
+    )
+
+def _sift(work, rows, pos, limit, loops):
+    # Sift every (row, pos) pair down at once; their subtrees must be disjoint
+    while rows.size:
+        loops += np.bincount(rows, minlength=loops.size)
+        largest = pos.copy()
+        left = 2 * pos + 1
+        right = left + 1
+
+        has_left = left < limit
+        idx = np.where(has_left, left, pos)
+        take = has_left & (work[rows, idx] > work[rows, largest])
+        largest = np.where(take, idx, largest)
+
+        has_right = right < limit
+        idx = np.where(has_right, right, pos)
+        take = has_right & (work[rows, idx] > work[rows, largest])
+        largest = np.where(take, idx, largest)
+
+        moved = largest != pos
+        rows, pos, largest = rows[moved], pos[moved], largest[moved]
+        top = work[rows, pos]
+        work[rows, pos] = work[rows, largest]
+        work[rows, largest] = top
+        pos = largest
+
+def _heap(batch):
+    K, n = batch.shape
+    work = batch.copy()
+    loops = np.zeros(K, dtype=np.int64)
+
+    # Build phase: nodes on the same level have disjoint subtrees
+    last = n // 2 - 1
+    if last >= 0:
+        depth = (last + 1).bit_length() - 1
+        for level in range(depth, -1, -1):
+            nodes = np.arange((1 << level) - 1, min((1 << (level + 1)) - 1, last + 1))
+            rows = np.repeat(np.arange(K), nodes.size)
+            pos = np.tile(nodes, K)
+            _sift(work, rows, pos, n, loops)
+
+    # The extraction phase is inherently sequential, so each row finishes
+    # with a plain list sift that counts the same heapify calls
+    for k in range(K):
+        arr = work[k].tolist()
+        count = 0
+        for i in range(n - 1, 0, -1):
+            arr[0], arr[i] = arr[i], arr[0]
+            pos = 0
+            while True:
+                count += 1
+                largest = pos
+                left = 2 * pos + 1
+                if left < i and arr[left] > arr[largest]:
+                    largest = left
+                if left + 1 < i and arr[left + 1] > arr[largest]:
+                    largest = left + 1
+                if largest == pos:
+                    break
+                arr[pos], arr[largest] = arr[largest], arr[pos]
+                pos = largest
+        work[k] = arr
+        loops[k] += count
+
+    return work, loops, np.zeros(K, dtype=np.int64)
+
+def _counting(batch):
+    K, n = batch.shape
+    if n == 0:
+        return batch.copy(), np.zeros(K, dtype=np.int64), np.zeros(K, dtype=np.int64)
+    k = batch.max(axis=1) - batch.min(axis=1) + 1
+    if (k > MAX_COUNTING_RANGE).any():
+        raise ValueError(f"counting sort needs a key range of at most {MAX_COUNTING_RANGE:,}, got {int(k.max()):,}")
+    return np.sort(batch, axis=1), n + k, k
+
+def _radix(batch):
+    K, n = batch.shape
+    if n == 0:
+        return batch.copy(), np.zeros(K, dtype=np.int64), np.zeros(K, dtype=np.int64)
+    # The pass count follows each row's key range, like the scalar function
+    spans = (batch.max(axis=1) - batch.min(axis=1)).tolist()
+    passes = np.array([-(-span.bit_length() // RADIX_BITS) for span in spans], dtype=np.int64)
+    return np.sort(batch, axis=1), passes * (2 * n + RADIX), np.full(K, n + RADIX, dtype=np.int64)
+
+def _bucket(batch):
+    K, n = batch.shape
+    if n < 2:
+        return batch.copy(), np.zeros(K, dtype=np.int64), np.zeros(K, dtype=np.int64)
+    # The same buckets as bucket_sort; after the stable distribution the only
+    # inversions left are inside buckets, and the final insertion pass makes
+    # one shift per inversion
+    low = batch.min(axis=1, keepdims=True)
+    width = -(-(batch.max(axis=1, keepdims=True) - low + 1) // n)
+    order = np.argsort((batch - low) // width, axis=1, kind="stable")
+    _, shifts, _ = _insertion(np.take_along_axis(batch, order, axis=1))
+    return np.sort(batch, axis=1), 2 * n + shifts, np.full(K, 2 * n, dtype=np.int64)
+
+ENGINES = {
+    bubble_sort: _bubble,
+    insertion_sort: _insertion,
+    selection_sort: _selection,
+    merge_sort: _merge,
+    heap_sort: _heap,
+    counting_sort: _counting,
+    radix_sort: _radix,
+    bucket_sort: _bucket,
+}
+
+def _scalar(func, batch):
+    rows, loops, space = [], [], []
+    for row in batch:
+        arr, loop_count, space_count = func(row.tolist(), speed=0, visualization=False)
+        rows.append(arr)
+        loops.append(loop_count)
+        space.append(space_count)
+    return np.array(rows, dtype=batch.dtype).reshape(batch.shape), np.array(loops), np.array(space)
+
+def batch_sort(func, batch):
+    """Sort every row of ``batch`` with ``func`` and return per-row counters.
+
+    Algorithms without a vectorized engine fall back to running the scalar
+    function once per row.
+    """
+    batch = np.atleast_2d(np.asarray(batch, dtype=np.int64))
+    engine = ENGINES.get(func)
+    if engine is None:
+        return _scalar(func, batch)
+    return engine(batch)
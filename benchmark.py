@@ -0,0 +1,203 @@
+import argparse
+import csv
+import gc
+import inspect
+import json
+import platform
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from cache import code_version
+from datasets import DISTRIBUTIONS, load
+from sorting import ALGORITHMS
+
+DEFAULT_SIZES = [100, 300, 1000, 3000, 10000]
+DEFAULT_DISTRIBUTIONS = ["random", "ascending", "descending"]
+
+# One benchmarked (algorithm, distribution, size) point; times are in seconds
+Point = namedtuple("Point", ["algorithm", "distribution", "n", "repeats", "min", "median", "iqr", "loops"])
+
+def time_point(func, data, repeats=5, warmup=1):
+    """Time ``func`` on fresh copies of ``data`` and return ``(min, median, iqr, loops)``.
+
+    ``warmup`` untimed runs come first. The garbage collector is paused while
+    timing, as timeit does, and sorts that take a ``scratch`` buffer get one
+    allocated up front and reused by every run.
+    """
+    data = [int(x) for x in data]
+    kwargs = {}
+    if "scratch" in inspect.signature(func).parameters:
+        kwargs["scratch"] = [0] * len(data)
+    for _ in range(warmup):
+        func(list(data), **kwargs)
+
+    samples = []
+    loops = None
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            work = list(data)
+            start = time.perf_counter()
+            _, loops, _ = func(work, **kwargs)
+            samples.append(time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return min(samples), float(median), float(q3 - q1), loops
+
+def fit_slope(points):
+    """Least-squares slope of log(median time) against log(n), or None with fewer than two sizes."""
+    points = [p for p in points if p.median > 0]
+    if len(points) < 2:
+        return None
+    x = np.log([p.n for p in points])
+    y = np.log([p.median for p in points])
+    return float(np.polyfit(x, y, 1)[0])
+
+def slopes(points):
+    """Return ``{algorithm: {distribution: slope}}`` for a list of Points."""
+    grouped = {}
+    for p in points:
+        grouped.setdefault(p.algorithm, {}).setdefault(p.distribution, []).append(p)
+    return {
+        name: {dist: fit_slope(group) for dist, group in by_dist.items()}
+        for name, by_dist in grouped.items()
+    }
+
+def run(algorithms=None, distributions=None, sizes=DEFAULT_SIZES, repeats=5, warmup=1, budget=1.0, seed=0, progress=None):
+    """Benchmark every algorithm on every distribution and size; returns a list of Points.
+
+    Sizes are visited in increasing order. Once a point's median exceeds
+    ``budget`` seconds the larger sizes of that (algorithm, distribution) are
+    skipped, so quadratic sorts stop on their own instead of at a fixed n.
+    ``progress(point)`` is called after every point.
+    """
+    algorithms = algorithms or list(ALGORITHMS)
+    distributions = distributions or DEFAULT_DISTRIBUTIONS
+    points = []
+    for name in algorithms:
+        for dist in distributions:
+            for n in sorted(sizes):
+                data = load(dist, n, seed)
+                best, median, iqr, loops = time_point(ALGORITHMS[name], data, repeats, warmup)
+                point = Point(name, dist, n, repeats, best, median, iqr, loops)
+                points.append(point)
+                if progress is not None:
+                    progress(point)
+                if median > budget:
+                    break
+    return points
+
+# --- Persistence ---
+def save_json(path, points):
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {
+                "code_version": code_version(),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "points": [p._asdict() for p in points],
+            "slopes": slopes(points),
+        }, f, indent=2)
+
+def load_json(path):
+    with open(path) as f:
+        return [Point(**p) for p in json.load(f)["points"]]
+
+def save_csv(path, points):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(Point._fields)
+        writer.writerows(points)
+
+# --- Regression check ---
+Comparison = namedtuple("Comparison", ["algorithm", "distribution", "n", "baseline", "current", "ratio", "regressed"])
+
+def compare(baseline, current, threshold=0.10):
+    """Match points by (algorithm, distribution, n) and flag slowdowns.
+
+    A point regresses when its median grew by more than ``threshold`` and
+    even its fastest run is slower than the baseline median, so a noisy
+    sample alone does not trip the check.
+    """
+    base = {(p.algorithm, p.distribution, p.n): p for p in baseline}
+    rows = []
+    for p in current:
+        old = base.get((p.algorithm, p.distribution, p.n))
+        if old is None or old.median <= 0:
+            continue
+        ratio = p.median / old.median
+        regressed = ratio > 1 + threshold and p.min > old.median
+        rows.append(Comparison(p.algorithm, p.distribution, p.n, old.median, p.median, ratio, regressed))
+    return rows
+
+# --- Command line ---
+def _print_points(points):
+    print(f"{'algorithm':<26}{'distribution':<16}{'n':>8}{'min (ms)':>12}{'median (ms)':>13}{'iqr (ms)':>11}")
+    for p in points:
+        print(f"{p.algorithm:<26}{p.distribution:<16}{p.n:>8}{1000 * p.min:>12.3f}{1000 * p.median:>13.3f}{1000 * p.iqr:>11.3f}")
+
+def _print_slopes(points):
+    print("\nEmpirical complexity exponents (log-log slope of median time)")
+    for name, by_dist in slopes(points).items():
+        cells = ", ".join(f"{dist} {'-' if s is None else f'{s:.2f}'}" for dist, s in by_dist.items())
+        print(f"  {name:<26}{cells}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time the algorithms and save the results")
+    run_parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), metavar="NAME")
+    run_parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--budget", type=float, default=1.0, help="skip larger sizes once a median exceeds this many seconds")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--json", help="write the results and fitted slopes to this file")
+    run_parser.add_argument("--csv", help="write one row per point to this file")
+    run_parser.add_argument("--baseline", help="compare against a previous --json file")
+    run_parser.add_argument("--threshold", type=float, default=0.10)
+
+    compare_parser = commands.add_parser("compare", help="compare two saved result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        points = run(
+            args.algorithms, args.distributions, args.sizes, args.repeats, args.warmup,
+            args.budget, args.seed, progress=lambda p: print(f"  {p.algorithm} / {p.distribution} / n={p.n}", file=sys.stderr),
+        )
+        _print_points(points)
+        _print_slopes(points)
+        if args.json:
+            save_json(args.json, points)
+        if args.csv:
+            save_csv(args.csv, points)
+        if not args.baseline:
+            return 0
+        baseline, current = load_json(args.baseline), points
+    else:
+        baseline, current = load_json(args.baseline), load_json(args.current)
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"\n{'algorithm':<26}{'distribution':<16}{'n':>8}{'baseline (ms)':>15}{'current (ms)':>14}{'ratio':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row.regressed else ""
+        print(f"{row.algorithm:<26}{row.distribution:<16}{row.n:>8}{1000 * row.baseline:>15.3f}{1000 * row.current:>14.3f}{row.ratio:>8.2f}{flag}")
+    regressions = sum(row.regressed for row in rows)
+    print(f"\n{regressions} regression(s) in {len(rows)} matched point(s)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
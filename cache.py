@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from metrics import RunRecord
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(HERE, ".cache", "results.sqlite")
+# The modules whose code decides a sort's output, counts and timings, and which
+# RunRecord fields are filled in
+VERSIONED = ("sorting.py", "batch.py", "parallel.py", "tracer.py", "metrics.py", "scheduler.py")
+
+def code_version():
+    # Any edit to the algorithms or their instrumentation changes this hash and retires old entries
+    digest = hashlib.sha256()
+    for name in VERSIONED:
+        with open(os.path.join(HERE, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def fingerprint(arr):
+    data = np.ascontiguousarray(arr, dtype=np.int64)
+    return hashlib.sha256(data.tobytes()).hexdigest()
+
+class ResultCache:
+    """Content-addressed SQLite cache of RunRecords.
+
+    Entries are keyed by the input fingerprint and algorithm name, and
+    stamped with the code version of the VERSIONED modules. Entries from
+    other versions are dropped on open, and the least recently used rows are
+    evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = code_version()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                " key TEXT PRIMARY KEY, version TEXT, record TEXT, last_used REAL)"
+            )
+            db.execute("DELETE FROM runs WHERE version != ?", (self.version,))
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def key(self, algorithm, digest):
+        return f"{algorithm}:{digest}"
+
+    def get_many(self, keys):
+        keys = list(keys)
+        found = {}
+        now = time.time()
+        with self._connect() as db:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(
+                    f"SELECT key, record FROM runs WHERE version = ? AND key IN ({marks})",
+                    [self.version] + chunk,
+                ).fetchall()
+                for key, record in rows:
+                    found[key] = RunRecord(**json.loads(record))
+                db.execute(
+                    f"UPDATE runs SET last_used = ? WHERE key IN ({marks})",
+                    [now] + chunk,
+                )
+        return found
+
+    def put_many(self, entries):
+        now = time.time()
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)",
+                [(key, self.version, json.dumps(record._asdict()), now)
+                 for key, record in entries.items()],
+            )
+            db.execute(
+                "DELETE FROM runs WHERE key IN (SELECT key FROM runs"
+                " ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def get(self, algorithm, digest):
+        key = self.key(algorithm, digest)
+        return self.get_many([key]).get(key)
+
+    def put(self, algorithm, digest, record):
+        self.put_many({self.key(algorithm, digest): record})
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM runs")
@@ -0,0 +1,125 @@
+import base64
+import json
+from array import array
+
+import streamlit.components.v1 as components
+
+from tracer import COMPARE, SWAP
+
+# Operations one page may ship to the browser. Each is inlined as about 17
+# bytes of base64, so this keeps a page to roughly 8 MB.
+MAX_CANVAS_OPS = 500000
+
+_TEMPLATE = """
+<canvas id="bars" style="width:100%;height:__HEIGHT__px;display:block"></canvas>
+<script>
+const cfg = __CONFIG__;
+function decode(b64, Type) {
+  const bin = atob(b64);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return new Type(bytes.buffer);
+}
+const values = decode(cfg.values, Float64Array);
+const kinds = decode(cfg.kinds, Int8Array);
+const first = decode(cfg.first, Int32Array);
+const second = decode(cfg.second, Float64Array);
+const n = values.length, total = kinds.length;
+const canvas = document.getElementById("bars");
+const ctx = canvas.getContext("2d");
+let maxValue = 0, minValue = 0;
+for (let i = 0; i < n; i++) { maxValue = Math.max(maxValue, values[i]); minValue = Math.min(minValue, values[i]); }
+const range = (maxValue - minValue) || 1;
+let width = 0, height = 0, highlight = -1;
+
+function resize() {
+  const dpr = window.devicePixelRatio || 1;
+  width = canvas.width = Math.round(canvas.clientWidth * dpr);
+  height = canvas.height = Math.round(cfg.height * dpr);
+  paintAll();
+}
+function paintBar(i) {
+  const x0 = Math.floor(i * width / n), x1 = Math.max(x0 + 1, Math.floor((i + 1) * width / n));
+  const zero = height * maxValue / range;
+  const y = height * (maxValue - values[i]) / range;
+  ctx.clearRect(x0, 0, x1 - x0, height);
+  ctx.fillStyle = i === highlight ? "red" : "steelblue";
+  ctx.fillRect(x0, Math.min(y, zero), Math.max(1, x1 - x0 - (n < width / 2 ? 1 : 0)), Math.abs(zero - y));
+}
+function paintAll() {
+  ctx.clearRect(0, 0, width, height);
+  for (let i = 0; i < n; i++) paintBar(i);
+}
+
+let applied = 0, start = null, lastPaint = 0;
+function frame(now) {
+  if (start === null) start = now;
+  if (now - lastPaint >= 1000 / cfg.fps) {
+    lastPaint = now;
+    // Coalesce every operation that is due; frames the browser missed are dropped
+    const due = Math.min(total, Math.floor((now - start) / 1000 * cfg.opsPerSecond) + 1);
+    const dirty = new Set([highlight]);
+    while (applied < due) {
+      const i = first[applied];
+      if (kinds[applied] === cfg.swap) {
+        const j = second[applied];
+        const tmp = values[i]; values[i] = values[j]; values[j] = tmp;
+        dirty.add(j);
+      } else {
+        values[i] = second[applied];
+      }
+      dirty.add(i);
+      highlight = i;
+      applied++;
+    }
+    dirty.add(highlight);
+    // Bars narrower than a pixel share columns, so repaint everything then
+    if (n > width) paintAll();
+    else dirty.forEach(i => { if (i >= 0) paintBar(i); });
+  }
+  if (applied < total) {
+    requestAnimationFrame(frame);
+  } else {
+    highlight = -1;
+    paintAll();
+  }
+}
+window.addEventListener("resize", resize);
+resize();
+requestAnimationFrame(frame);
+</script>
+"""
+
+def _b64(typecode, values):
+    return base64.b64encode(array(typecode, values).tobytes()).decode("ascii")
+
+def canvas_ops(trace):
+    """How many operations ``draw_trace_canvas`` ships for ``trace``: all but the compares."""
+    return len(trace) - trace.ops.count(COMPARE)
+
+def draw_trace_canvas(trace, plot_spot, speed=60, fps=60, height=300, duration=None):
+    """Animate a Trace client-side on a canvas inside ``plot_spot``.
+
+    The trace is shipped once as binary deltas (changed indices and values);
+    the browser applies the operations that are due each frame and repaints
+    only the bars they touched, so no chart is rebuilt per step. ``speed`` is
+    in operations per second unless a ``duration`` in seconds is given.
+    Callers check ``canvas_ops`` against MAX_CANVAS_OPS first and draw from
+    the server past it.
+    """
+    steps = [s for s in range(len(trace)) if trace.ops[s] != COMPARE]
+    if duration:
+        speed = len(steps) / duration
+    config = {
+        "values": _b64('d', trace.initial),
+        "kinds": _b64('b', (trace.ops[s] for s in steps)),
+        "first": _b64('i', (trace.first[s] for s in steps)),
+        "second": _b64('d', (trace.second[s] for s in steps)),
+        "swap": SWAP,
+        "opsPerSecond": max(float(speed), 1e-3),
+        "fps": fps,
+        "height": height,
+    }
+    html = _TEMPLATE.replace("__CONFIG__", json.dumps(config)).replace("__HEIGHT__", str(height))
+    with plot_spot:
+        components.html(html, height=height + 10)
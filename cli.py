@@ -0,0 +1,201 @@
+import argparse
+import json
+import re
+import sys
+
+# Only the standard library is imported up front. The sorting core, NumPy
+# and the process pool are imported by the commands that need them, and
+# nothing here touches Streamlit or a plotting library.
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def _resolve(name):
+    from sorting import ALGORITHMS
+    # Accept the registry name or its slug, e.g. "Merge Sort" or "merge-sort"
+    for key in ALGORITHMS:
+        if name == key or _slug(name) == _slug(key):
+            return key
+    raise SystemExit(f"unknown algorithm {name!r}; run 'python cli.py list' for the choices")
+
+def _read_ints(path):
+    from external import parse_ints
+    if path == "-":
+        return list(parse_ints(sys.stdin.buffer))
+    with open(path, "rb") as f:
+        return list(parse_ints(f))
+
+def _dump(payload, path):
+    text = json.dumps(payload, indent=2)
+    if path in (None, "-"):
+        print(text)
+    else:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+
+def cmd_list(args):
+    from datasets import DISTRIBUTIONS
+    from sorting import ALGORITHMS, COMPLEXITIES
+    _dump({
+        "algorithms": [
+            {"name": name, "slug": _slug(name), "complexity": COMPLEXITIES[name]}
+            for name in ALGORITHMS
+        ],
+        "distributions": list(DISTRIBUTIONS),
+    }, None)
+    return 0
+
+def cmd_sort(args):
+    from sorting import ALGORITHMS
+    name = _resolve(args.algorithm)
+    func = ALGORITHMS[name]
+
+    if args.external:
+        # Stream the file through sorted runs on disk instead of loading it
+        from external import external_sort
+        src = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+        dst = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            stats = external_sort(src, dst, args.memory_mb << 20, func)
+        except (ValueError, OverflowError) as e:
+            raise SystemExit(f"{name} failed: {type(e).__name__}: {e}")
+        finally:
+            if src is not sys.stdin.buffer:
+                src.close()
+            if dst is not sys.stdout.buffer:
+                dst.close()
+        if args.metrics:
+            _dump({"algorithm": name, **stats._asdict()}, args.metrics)
+        return 0
+
+    values = _read_ints(args.input)
+    try:
+        if args.metrics:
+            from metrics import measure
+            sorted_arr, record = measure(func, values)
+        else:
+            sorted_arr, _, _ = func(values)
+            record = None
+    except ValueError as e:
+        # e.g. Counting Sort on a key range wider than MAX_COUNTING_RANGE
+        raise SystemExit(f"{name} failed: {type(e).__name__}: {e}")
+
+    text = "".join(f"{x}\n" for x in sorted_arr)
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    if record is not None:
+        _dump({"algorithm": name, "n": len(values), **record._asdict()}, args.metrics)
+    return 0
+
+def cmd_compare(args):
+    from sorting import ALGORITHMS
+    from scheduler import WorkUnit, run_units
+    names = [_resolve(name) for name in args.algorithms] if args.algorithms else list(ALGORITHMS)
+
+    if args.input:
+        import numpy as np
+        arr = np.asarray(_read_ints(args.input), dtype=np.int64)
+        source = {"input": args.input}
+    else:
+        from datasets import load
+        arr = load(args.distribution, args.size, args.seed)
+        source = {"distribution": args.distribution, "seed": args.seed}
+    key = (len(arr), "cli", 0)
+
+    cache = None
+    if not args.no_cache:
+        from cache import ResultCache
+        cache = ResultCache()
+    outcome = run_units(
+        [WorkUnit(name, len(arr), "cli", 0) for name in names], {key: arr},
+        args.processes, instrument=True, cache=cache,
+    )
+    results = []
+    for name in names:
+        run = outcome[WorkUnit(name, len(arr), "cli", 0)]
+        if run.error is not None:
+            results.append({"algorithm": name, "error": run.error})
+        else:
+            results.append({"algorithm": name, **run.record._asdict()})
+    _dump({**source, "n": len(arr), "results": results}, args.output)
+    return 1 if any("error" in row for row in results) else 0
+
+def cmd_export(args):
+    from sorting import ALGORITHMS
+    from tracer import Trace
+    from export import export_animation
+    names = [_resolve(name) for name in args.algorithms] if args.algorithms else list(ALGORITHMS)
+
+    if args.input:
+        values = _read_ints(args.input)
+    else:
+        from datasets import load
+        values = [int(x) for x in load(args.distribution, args.size, args.seed)]
+    traces = []
+    for name in names:
+        trace = Trace(values, record_compares=False)
+        ALGORITHMS[name](list(values), trace=trace)
+        traces.append(trace)
+
+    # Without an explicit skip, spread the longest trace over about --frames frames
+    step = args.frame_skip or max(1, -(-max(len(t) for t in traces) // args.frames))
+    stats = export_animation(
+        traces, args.output, step, args.fps, args.width, args.height,
+        args.columns, names, args.processes,
+    )
+    _dump({"algorithms": names, "n": len(values), "frame_skip": step, **stats._asdict()}, None)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the sorting algorithms without the Streamlit app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="print the algorithms and input distributions as JSON")
+    list_parser.set_defaults(handler=cmd_list)
+
+    sort_parser = commands.add_parser("sort", help="sort a file of integers, one per line")
+    sort_parser.add_argument("input", help="input file, or - for stdin")
+    sort_parser.add_argument("-a", "--algorithm", default="merge-sort")
+    sort_parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout")
+    sort_parser.add_argument("--metrics", help="write the run's metrics as JSON to this file (- for stdout)")
+    sort_parser.add_argument("--external", action="store_true", help="sort on disk within --memory-mb")
+    sort_parser.add_argument("--memory-mb", type=int, default=64)
+    sort_parser.set_defaults(handler=cmd_sort)
+
+    compare_parser = commands.add_parser("compare", help="run every algorithm on one input and print metrics as JSON")
+    source = compare_parser.add_mutually_exclusive_group()
+    source.add_argument("--input", help="file of integers, one per line (- for stdin)")
+    source.add_argument("--distribution", default="random")
+    compare_parser.add_argument("--size", type=int, default=1000)
+    compare_parser.add_argument("--seed", type=int, default=0)
+    compare_parser.add_argument("--algorithms", nargs="+")
+    compare_parser.add_argument("--processes", type=int)
+    compare_parser.add_argument("--no-cache", action="store_true")
+    compare_parser.add_argument("-o", "--output", default="-")
+    compare_parser.set_defaults(handler=cmd_compare)
+
+    export_parser = commands.add_parser("export", help="render sorting animations to a GIF, APNG or MP4 file")
+    source = export_parser.add_mutually_exclusive_group()
+    source.add_argument("--input", help="file of integers, one per line (- for stdin)")
+    source.add_argument("--distribution", default="random")
+    export_parser.add_argument("--size", type=int, default=200)
+    export_parser.add_argument("--seed", type=int, default=0)
+    export_parser.add_argument("--algorithms", nargs="+", help="one panel each; every algorithm by default")
+    export_parser.add_argument("--frame-skip", type=int, help="recorded operations per frame")
+    export_parser.add_argument("--frames", type=int, default=300, help="target frame count when --frame-skip is not given")
+    export_parser.add_argument("--fps", type=int, default=30)
+    export_parser.add_argument("--width", type=int, default=800)
+    export_parser.add_argument("--height", type=int, default=300)
+    export_parser.add_argument("--columns", type=int, default=2)
+    export_parser.add_argument("--processes", type=int)
+    export_parser.add_argument("-o", "--output", required=True, help="the extension picks the format: .gif, .png/.apng or .mp4")
+    export_parser.set_defaults(handler=cmd_export)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,116 @@
+import os
+
 import numpy as np
-import matplotlib.pyplot as plt
-import threading
-from copy import deepcopy
-from tqdm import tqdm
-from sorting import *
-
-def generate_plot():
-    algorithms = {
-        "Bubble Sort": bubble_sort,
-        "Insertion Sort": insertion_sort,
-        "Selection Sort": selection_sort,
-        "Merge Sort": merge_sort,
-        "Heap Sort": heap_sort,
-        "Quick Sort": quick_sort,
-        "Quick Sort (Median of 3)": quick_sort_median3,
-    }
-
-    complexities = {
-        "Bubble Sort": "O(n²)",
-        "Insertion Sort": "O(n²)",
-        "Selection Sort": "O(n²)",
-        "Merge Sort": "O(n log n)",
-        "Heap Sort": "O(n log n)",
-        "Quick Sort": "O(n log n)",
-        "Quick Sort (Median of 3)": "O(n log n)",
-    }
-
-    sizes = np.logspace(1, 6, num=10, dtype=int)
-
-    def evaluate_case(case_name, generator_func, filename):
-        results = {name: [] for name in algorithms}
-        total_tasks = len(algorithms) * len(sizes)
-        progress = tqdm(total=total_tasks, desc=f"Evaluating {case_name}", ncols=100)
-        lock = threading.Lock()
+from sorting import ALGORITHMS, COMPLEXITIES, NON_COMPARISON, PARALLEL
+from datasets import load
+from metrics import MEMORY_BUDGET, METRICS
+from profiling import Profiler
+from sweep import DEFAULT_PATH, DEFAULT_TIMEOUT, Point, ResultLog, run_sweep
+
+SEEDS = 8
+# Only the non-comparison sorts, whose engines run in linear time, go past 10^6;
+# one seed each keeps the inputs within memory
+LARGE_SIZES = [3162277, 10000000]
+
+# --- Cases: (distribution in datasets.py, seeds, output file) ---
+CASES = {
+    "Average": ("random", SEEDS, "complexity_average.png"),
+    "Best": ("ascending", 1, "complexity_best.png"),
+    "Worst": ("descending", 1, "complexity_worst.png"),
+    "Adversarial": ("median3-killer", 1, "complexity_adversarial.png"),
+}
+
+def _seeds(n, seeds):
+    return seeds if n <= 10**6 else 1
+
+def generate_plot(processes=None, resume=True, metric="loops", profile=None,
+                  timeout=DEFAULT_TIMEOUT, results=DEFAULT_PATH):
+    """Sweep every case and write one plot per case.
+
+    Each point is appended to the ``results`` file as it completes, and a
+    rerun with ``resume`` skips the points already there; ``resume=False``
+    starts the file afresh. A point that runs past ``timeout`` seconds is
+    stopped along with the larger sizes of its algorithm and case, and
+    points that raised are listed at the end.
+
+    With ``profile`` set to a .json path, the sweep is timed per phase and
+    every point runs under cProfile in its worker; the report goes to that
+    path, with one .prof file per algorithm beside it.
+    """
+    # Batch plotting needs no display: select the non-interactive backend
+    # before pyplot loads, and only when a plot is actually made
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from tqdm import tqdm
+
+    profiler = Profiler(enabled=profile is not None)
+    profiler.start_sampling()
+
+    algorithms = ALGORITHMS
+    complexities = COMPLEXITIES
+    # Anything beyond the algorithms' own counters needs full instrumentation,
+    # which only the scalar functions provide
+    instrument = metric not in ("loops", "space")
+
+    sizes = np.concatenate([np.logspace(1, 6, num=10, dtype=int), LARGE_SIZES])
+    chains = _build_chains(algorithms, sizes, instrument)
 
-        def evaluate_algorithm(name, func):
+    if not resume and os.path.exists(results):
+        os.remove(results)
+    progress = tqdm(total=sum(seeds for chain in chains.values() for _, seeds in chain), desc="Evaluating", ncols=100)
+    with ResultLog(results) as log:
+        with profiler.phase("run points"):
+            run_sweep(
+                chains, {case: distribution for case, (distribution, _, _) in CASES.items()}, log,
+                processes, timeout, instrument, callback=lambda result: progress.update(1),
+                profiler=profiler if profile is not None else None,
+                # A peak memory sweep measures memory however slow tracemalloc makes the run
+                memory_budget=None if metric == "peak_bytes" else MEMORY_BUDGET,
+            )
+        progress.close()
+        outcome = {point: log.get(point, instrument, timeout) for point in _points(chains)}
+
+    failed = [result for result in outcome.values() if result is not None and result.status == "error"]
+    for result in failed:
+        p = result.point
+        print(f"{p.algorithm} failed on {p.case} n={p.n} seed={p.seed}: {result.error}")
+
+    with profiler.phase("plot"):
+        _plot(outcome, algorithms, complexities, sizes, metric, plt)
+
+    profiler.stop_sampling()
+    if profile is not None:
+        profiler.save(profile)
+        for p in profiler.report():
+            print(f"{p.phase:<20}{p.seconds:>10.3f}s{p.calls:>8}{p.share:>8.0%}")
+
+def _build_chains(algorithms, sizes, instrument):
+    chains = {}
+    for case_name, (_, seeds, _) in CASES.items():
+        for name in algorithms:
+            chains[(case_name, name)] = [
+                (int(n), _seeds(n, seeds)) for n in sizes
+                if n <= 10**6 or (name in NON_COMPARISON and not instrument)
+            ]
+    return chains
+
+def _points(chains):
+    for (case_name, name), sizes in chains.items():
+        for n, seeds in sizes:
+            for seed in range(seeds):
+                yield Point(case_name, name, n, seed)
+
+def _plot(outcome, algorithms, complexities, sizes, metric, plt):
+    for case_name, (_, seeds, filename) in CASES.items():
+        results = {name: [] for name in algorithms}
+        for name in algorithms:
             for n in sizes:
-                if "O(n²)" in complexities[name] and n > 10000:
+                runs = [outcome.get(Point(case_name, name, int(n), seed)) for seed in range(_seeds(n, seeds))]
+                if any(run is None or run.status != "ok" or getattr(run.record, metric) is None for run in runs):
                     results[name].append(None)
                 else:
-                    try:
-                        arr = generator_func(n)
-                        _, loops, _ = func(deepcopy(arr), speed=0, visualization=False)
-                        results[name].append(loops)
-                    except Exception:
-                        results[name].append(None)
-                with lock:
-                    progress.update(1)
-
-        threads = []
-        for name, func in algorithms.items():
-            t = threading.Thread(target=evaluate_algorithm, args=(name, func))
-            threads.append(t)
-            t.start()
-
-        for t in threads:
-            t.join()
-        progress.close()
+                    results[name].append(float(np.mean([getattr(run.record, metric) for run in runs])))
 
         # Plot results
         plt.figure(figsize=(28, 16), dpi=300)
@@ -67,7 +121,7 @@ def generate_plot():
         plt.xscale('log')
         plt.yscale('log')
         plt.xlabel("Input Size (N)", fontsize=28)
-        plt.ylabel("Loop Count", fontsize=28)
+        plt.ylabel(METRICS[metric], fontsize=28)
         plt.title(f"{case_name} Case: Runtime Complexity vs Input Size", fontsize=24)
         plt.legend(fontsize=20)
         plt.grid(True, which="both", linestyle="--", linewidth=2.5)
@@ -76,22 +130,50 @@ def generate_plot():
         plt.tight_layout()
         plt.savefig(filename)
 
-    # Define data generators
-    def average_case(n):
-        return np.random.randint(0, 1000000, size=n).tolist()
+def generate_scaling_plot(n=1000000, cores=None, repeats=3, filename="complexity_parallel.png"):
+    """Plot speedup and efficiency against process count for the parallel sorts."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from parallel import scaling
 
-    def best_case(n):
-        return list(range(n))
+    cores = cores or sorted({2 ** k for k in range((os.cpu_count() or 1).bit_length())} | {os.cpu_count() or 1})
+    data = load("random", n)
+    report = {name: scaling(name, data, cores, repeats) for name in sorted(PARALLEL)}
 
-    def worst_case(n):
-        return list(range(n, 0, -1))
+    print(f"{'algorithm':<24}{'processes':>10}{'seconds':>10}{'speedup':>10}{'efficiency':>12}")
+    for rows in report.values():
+        for row in rows:
+            print(f"{row.algorithm:<24}{row.processes:>10}{row.seconds:>10.3f}{row.speedup:>10.2f}{row.efficiency:>12.2f}")
 
-    # Run all three plots
-    evaluate_case("Average", average_case, "complexity_average.png")
-    evaluate_case("Best", best_case, "complexity_best.png")
-    evaluate_case("Worst", worst_case, "complexity_worst.png")
+    fig, (left, right) = plt.subplots(1, 2, figsize=(16, 7))
+    for name, rows in report.items():
+        procs = [row.processes for row in rows]
+        left.plot(procs, [row.speedup for row in rows], marker="o", label=name)
+        right.plot(procs, [row.efficiency for row in rows], marker="o", label=name)
+    procs = sorted({row.processes for rows in report.values() for row in rows})
+    left.plot(procs, procs, linestyle="--", color="gray", label="Ideal")
+    right.axhline(1.0, linestyle="--", color="gray", label="Ideal")
+    left.set(xlabel="Processes", ylabel="Speedup (T1 / Tp)", title=f"Speedup, N = {n:,}")
+    right.set(xlabel="Processes", ylabel="Efficiency (speedup / p)", title=f"Efficiency, N = {n:,}")
+    for ax in (left, right):
+        ax.legend()
+        ax.grid(True, linestyle="--")
+    fig.tight_layout()
+    fig.savefig(filename)
+    return report
 
 # ------------------ Run the Plot ------------------
 
 if __name__ == "__main__":
-    generate_plot()
+    import argparse
+    parser = argparse.ArgumentParser(description="Plot the algorithms' cost against input size.")
+    parser.add_argument("--metric", default="loops", choices=list(METRICS))
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--restart", action="store_true", help="discard the results file instead of resuming from it")
+    parser.add_argument("--results", default=DEFAULT_PATH, help="append-only results file the sweep resumes from")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a point and the larger sizes of its algorithm are dropped")
+    parser.add_argument("--profile", metavar="PATH", help="profile the sweep and write the report to this .json file")
+    args = parser.parse_args()
+    generate_plot(args.processes, not args.restart, args.metric, args.profile, args.timeout, args.results)
+    generate_scaling_plot()
@@ -0,0 +1,131 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_HIGH = 1000000
+# Inputs at least this long are kept as .npy files and memory-mapped on reuse
+MMAP_THRESHOLD = 1 << 16
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "datasets")
+
+# --- Generators: (n, rng, high) -> int64 array with values in [1, high] ---
+def uniform(n, rng, high):
+    return rng.integers(1, high, size=n, endpoint=True, dtype=np.int64)
+
+def ascending(n, rng, high):
+    return np.sort(uniform(n, rng, high))
+
+def descending(n, rng, high):
+    return np.sort(uniform(n, rng, high))[::-1].copy()
+
+def nearly_sorted(n, rng, high, swaps=None):
+    # Sorted data with ``swaps`` disjoint random transpositions (1% of n by default)
+    arr = ascending(n, rng, high)
+    swaps = max(1, n // 100) if swaps is None else swaps
+    swaps = min(swaps, n // 2)
+    picks = rng.choice(n, size=2 * swaps, replace=False)
+    i, j = picks[:swaps], picks[swaps:]
+    arr[i], arr[j] = arr[j], arr[i]
+    return arr
+
+def few_unique(n, rng, high, keys=8):
+    values = rng.integers(1, high, size=keys, endpoint=True, dtype=np.int64)
+    return values[rng.integers(0, keys, size=n)]
+
+def organ_pipe(n, rng, high):
+    # Rises to the middle, then falls back
+    x = np.arange(n, dtype=np.int64)
+    height = np.minimum(x, n - 1 - x)
+    return 1 + height * (high - 1) // max(1, (n - 1) // 2)
+
+def sawtooth(n, rng, high, teeth=8):
+    period = max(2, -(-n // teeth))
+    x = np.arange(n, dtype=np.int64) % period
+    return 1 + x * (high - 1) // (period - 1)
+
+def gaussian(n, rng, high):
+    values = np.rint(rng.normal(high / 2, high / 8, size=n))
+    return np.clip(values, 1, high).astype(np.int64)
+
+def zipf(n, rng, high, exponent=1.5):
+    # Heavy-tailed: a handful of keys cover most of the input
+    return np.minimum(rng.zipf(exponent, size=n), high).astype(np.int64)
+
+def median3_killer(n, rng, high):
+    # Musser's sequence that drives median-of-3 quicksort to O(n^2).
+    # It is a permutation of 1..n, so ``high`` is ignored.
+    k = n // 2
+    arr = np.empty(n, dtype=np.int64)
+    i = np.arange(1, k + 1, dtype=np.int64)
+    odd = i[i % 2 == 1]
+    arr[odd - 1] = odd
+    # The first half holds every odd number below 2k. For odd k the last odd
+    # i fills the first half's final slot itself, and its partners shift up
+    # by one so they stay odd.
+    pair = odd[odd < k]
+    arr[pair] = k + k % 2 + pair
+    arr[k:2 * k] = 2 * i
+    if n % 2:
+        arr[-1] = n
+    return arr
+
+DISTRIBUTIONS = {
+    "random": uniform,
+    "ascending": ascending,
+    "descending": descending,
+    "nearly-sorted": nearly_sorted,
+    "few-unique": few_unique,
+    "organ-pipe": organ_pipe,
+    "sawtooth": sawtooth,
+    "gaussian": gaussian,
+    "zipf": zipf,
+    "median3-killer": median3_killer,
+}
+
+# Titles shown in the app
+LABELS = {
+    "random": "Random Numbers",
+    "ascending": "Random Ascending Numbers",
+    "descending": "Random Descending Numbers",
+    "nearly-sorted": "Nearly Sorted (1% swapped)",
+    "few-unique": "Few Unique Keys",
+    "organ-pipe": "Organ Pipe",
+    "sawtooth": "Sawtooth",
+    "gaussian": "Gaussian",
+    "zipf": "Zipfian",
+    "median3-killer": "Median-of-3 Killer",
+}
+
+def generate(name, n, seed=0, high=DEFAULT_HIGH):
+    """Build distribution ``name`` of length ``n``; the same seed always gives the same data."""
+    rng = np.random.default_rng([n, seed])
+    return DISTRIBUTIONS[name](n, rng, high)
+
+@lru_cache(maxsize=1)
+def _version():
+    # Editing a generator retires the files it wrote
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+@lru_cache(maxsize=64)
+def load(name, n, seed=0, high=DEFAULT_HIGH, cache_dir=DEFAULT_DIR):
+    """Memoized, read-only ``generate``.
+
+    Inputs of ``MMAP_THRESHOLD`` elements or more are also written to
+    ``cache_dir`` as .npy files and memory-mapped, so later processes reuse
+    them instead of regenerating. Copy the result before sorting it in place.
+    """
+    if n < MMAP_THRESHOLD or cache_dir is None:
+        arr = generate(name, n, seed, high)
+        arr.setflags(write=False)
+        return arr
+    path = os.path.join(cache_dir, f"{name}-{n}-{seed}-{high}-{_version()}.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a private name first so concurrent loaders never see half a file
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as f:
+            np.save(f, generate(name, n, seed, high))
+        os.replace(partial, path)
+    return np.load(path, mmap_mode="r")
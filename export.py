@@ -0,0 +1,194 @@
+import os
+import shutil
+import subprocess
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from scheduler import _context
+from tracer import TracePlayer
+
+ExportStats = namedtuple("ExportStats", ["path", "frames", "seconds"])
+
+# Frames are drawn as indices into this palette, so GIF frames need no
+# quantizing and workers ship one byte per pixel
+PALETTE = [
+    (255, 255, 255),  # background
+    (70, 130, 180),   # bar: steelblue
+    (176, 196, 222),  # envelope above a column's minimum: lightsteelblue
+    (220, 20, 60),    # highlight: crimson
+    (0, 0, 0),        # title text
+]
+BACKGROUND, BAR, ENVELOPE, HIGHLIGHT, TEXT = range(len(PALETTE))
+TITLE_HEIGHT = 18
+# Frames handed to a worker at a time; consecutive frames replay cheaply
+CHUNK = 32
+
+# --- Rasterizing ---
+def _render_panel(player, width, height, low, high):
+    canvas = np.full((height, width), BACKGROUND, dtype=np.uint8)
+    values = np.frombuffer(player.arr, dtype=np.int64)
+    n = len(values)
+    if n == 0:
+        return canvas
+    scale = (height - 1) / max(high - low, 1)
+    rows = np.arange(height - 1, -1, -1)[:, None]
+    if n <= width:
+        # Each element spans whole columns; leave a one-pixel gap when there is room
+        column = np.arange(width) * n // width
+        tops = ((values[column] - low) * scale).astype(np.int64)
+        canvas[rows <= tops] = BAR
+        if width >= 2 * n:
+            edges = np.flatnonzero(np.diff(column)) + 1
+            canvas[:, edges] = BACKGROUND
+        hit = column == (-1 if player.highlight is None else player.highlight)
+    else:
+        edges = np.arange(width + 1) * n // width
+        maxs = np.maximum.reduceat(values, edges[:-1])
+        mins = np.minimum.reduceat(values, edges[:-1])
+        canvas[rows <= ((maxs - low) * scale).astype(np.int64)] = ENVELOPE
+        canvas[rows <= ((mins - low) * scale).astype(np.int64)] = BAR
+        hit = np.zeros(width, dtype=bool)
+        if player.highlight is not None:
+            hit[np.searchsorted(edges, player.highlight, side="right") - 1] = True
+    if hit.any():
+        columns = canvas[:, hit]
+        columns[columns != BACKGROUND] = HIGHLIGHT
+        canvas[:, hit] = columns
+    return canvas
+
+def _layout(count, columns):
+    columns = max(1, min(columns, count))
+    return -(-count // columns), columns
+
+# --- Worker side ---
+_job = None
+
+def _init_worker(job):
+    global _job
+    traces, titles, options = job
+    players = [TracePlayer(trace) for trace in traces]
+    # Values only move around during a sort, so the initial range holds for every frame
+    ranges = [(min(trace.initial, default=0), max(trace.initial, default=0)) for trace in traces]
+    _job = (players, titles, ranges, options)
+
+def _render_frame(index):
+    players, titles, ranges, options = _job
+    step, width, height, columns = options
+    rows, columns = _layout(len(players), columns)
+    panel_width, panel_height = width // columns, height // rows
+    title_height = TITLE_HEIGHT if titles else 0
+    frame = np.full((height, width), BACKGROUND, dtype=np.uint8)
+    for p, player in enumerate(players):
+        player.seek(index * step)
+        r, c = divmod(p, columns)
+        panel = _render_panel(player, panel_width - 4, panel_height - title_height - 4, *ranges[p])
+        y = r * panel_height + title_height + 2
+        x = c * panel_width + 2
+        frame[y:y + panel.shape[0], x:x + panel.shape[1]] = panel
+    return frame
+
+def _render_chunk(indices):
+    return [_render_frame(i).tobytes() for i in indices]
+
+def _draw_titles(image, titles, width, height, count, columns):
+    if not titles:
+        return image
+    from PIL import ImageDraw
+
+    rows, columns = _layout(count, columns)
+    draw = ImageDraw.Draw(image)
+    for p, title in enumerate(titles):
+        r, c = divmod(p, columns)
+        draw.text((c * (width // columns) + 4, r * (height // rows) + 3), title, fill=TEXT)
+    return image
+
+# --- Parent side ---
+def frame_count(traces, step):
+    return max(-(-len(trace) // step) for trace in traces) + 1
+
+def render_frames(traces, step=1, width=800, height=300, columns=2, titles=None, processes=None):
+    """Yield every frame of ``traces`` played side by side as palette ("P") PIL images.
+
+    Every ``step`` recorded operations make one frame, and all panels advance
+    by the same number of operations per frame, like the comparison view.
+    Frames are rasterized with NumPy in a pool of worker processes, in chunks
+    of consecutive frames, and yielded in order. Arrays wider than a panel
+    are drawn as a min/max envelope per pixel column.
+    """
+    from PIL import Image
+
+    palette = [channel for color in PALETTE for channel in color]
+    traces = list(traces)
+    total = frame_count(traces, step)
+    chunks = [range(start, min(start + CHUNK, total)) for start in range(0, total, CHUNK)]
+    job = (traces, titles, (step, width, height, columns))
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(chunks) == 1:
+        _init_worker(job)
+        results = map(_render_chunk, chunks)
+        pool = None
+    else:
+        pool = _context().Pool(processes, initializer=_init_worker, initargs=(job,))
+        results = pool.imap(_render_chunk, chunks)
+    try:
+        for chunk in results:
+            for raw in chunk:
+                image = Image.frombytes("P", (width, height), raw)
+                image.putpalette(palette)
+                yield _draw_titles(image, titles, width, height, len(traces), columns)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+def _ffmpeg():
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        raise RuntimeError("MP4 export needs ffmpeg on PATH or the imageio-ffmpeg package") from None
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+def export_animation(traces, path, step=1, fps=30, width=800, height=300, columns=2, titles=None, processes=None):
+    """Render ``traces`` to ``path``; the extension picks GIF, APNG (.png/.apng) or MP4.
+
+    Returns an ExportStats. GIF and MP4 frames are streamed to the encoder
+    as they arrive, MP4 as raw RGB piped to ffmpeg; APNG holds every frame
+    in memory, so prefer a larger ``step`` for it.
+    """
+    start = time.perf_counter()
+    # yuv420p video needs even dimensions
+    width, height = width - width % 2, height - height % 2
+    frames = render_frames(traces, step, width, height, columns, titles, processes)
+    total = frame_count(traces, step)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".mp4":
+        command = [
+            _ffmpeg(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-pix_fmt", "yuv420p", "-vcodec", "libx264", path,
+        ]
+        encoder = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            for image in frames:
+                encoder.stdin.write(image.convert("RGB").tobytes())
+        finally:
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError(f"ffmpeg exited with status {encoder.returncode}")
+    elif ext in (".gif", ".png", ".apng"):
+        first = next(frames)
+        save = {"save_all": True, "append_images": frames, "duration": round(1000 / fps), "loop": 0}
+        if ext == ".gif":
+            first.save(path, format="GIF", optimize=False, **save)
+        else:
+            # Pillow's APNG writer walks append_images twice, so it needs a list
+            save["append_images"] = list(frames)
+            first.save(path, format="PNG", **save)
+    else:
+        raise ValueError(f"unsupported animation format {ext!r}; use .gif, .png/.apng or .mp4")
+    return ExportStats(path, total, time.perf_counter() - start)
@@ -0,0 +1,104 @@
+import heapq
+import os
+import tempfile
+import time
+from array import array
+from collections import namedtuple
+
+from sorting import merge_sort
+
+# Rough in-memory cost of one element while a run is sorted: the boxed int,
+# its list slot and its slot in merge_sort's scratch buffer
+BYTES_PER_ITEM = 100
+CHUNK_BYTES = 1 << 20
+
+ExternalSortStats = namedtuple("ExternalSortStats", ["items", "runs", "run_length", "seconds"])
+
+def parse_ints(fileobj, chunk_bytes=CHUNK_BYTES):
+    """Yield the integers of a one-per-line file, reading ``chunk_bytes`` at a time."""
+    carry = b""
+    while True:
+        block = fileobj.read(chunk_bytes)
+        if not block:
+            break
+        if isinstance(block, str):
+            block = block.encode("utf-8")
+        lines = (carry + block).split(b"\n")
+        carry = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield int(line)
+    if carry.strip():
+        yield int(carry)
+
+def _spill(run, directory, index):
+    path = os.path.join(directory, f"run{index:05d}.bin")
+    with open(path, "wb") as f:
+        array('q', run).tofile(f)
+    return path
+
+def _read_run(path, block_items):
+    with open(path, "rb") as f:
+        while True:
+            block = array('q')
+            try:
+                block.fromfile(f, block_items)
+            except EOFError:
+                # fromfile keeps the items it could read before raising
+                yield from block
+                return
+            yield from block
+
+def external_sort(fileobj, out, memory_budget=64 << 20, sort_func=merge_sort, tmpdir=None, progress=None):
+    """Sort a one-integer-per-line stream into ``out`` within a memory budget.
+
+    The input is parsed in chunks into runs of at most
+    ``memory_budget // BYTES_PER_ITEM`` items. Each run is sorted in memory
+    with ``sort_func`` and spilled to a temporary binary file. The runs are
+    then k-way merged with a heap straight into ``out``, a binary file
+    object. ``progress(phase, done, total)`` is called as runs are written
+    ("run") and as items are merged ("merge").
+    """
+    start = time.perf_counter()
+    run_length = max(1024, memory_budget // BYTES_PER_ITEM)
+    with tempfile.TemporaryDirectory(dir=tmpdir) as directory:
+        paths = []
+        items = 0
+        run = []
+        for value in parse_ints(fileobj):
+            run.append(value)
+            if len(run) == run_length:
+                run, _, _ = sort_func(run)
+                paths.append(_spill(run, directory, len(paths)))
+                items += len(run)
+                run = []
+                if progress is not None:
+                    progress("run", len(paths), None)
+        if run:
+            run, _, _ = sort_func(run)
+            paths.append(_spill(run, directory, len(paths)))
+            items += len(run)
+            run = []
+            if progress is not None:
+                progress("run", len(paths), None)
+
+        # Split the budget between one read buffer per run and the output buffer
+        block_items = max(1024, memory_budget // (16 * (len(paths) + 1)))
+        readers = [_read_run(path, block_items) for path in paths]
+        merged = 0
+        pending = []
+        for value in heapq.merge(*readers):
+            pending.append(b"%d\n" % value)
+            if len(pending) == block_items:
+                out.write(b"".join(pending))
+                merged += len(pending)
+                pending = []
+                if progress is not None:
+                    progress("merge", merged, items)
+        if pending:
+            out.write(b"".join(pending))
+            merged += len(pending)
+        if progress is not None:
+            progress("merge", merged, items)
+
+    return ExternalSortStats(items, len(paths), run_length, time.perf_counter() - start)
@@ -0,0 +1,143 @@
+import math
+import threading
+import time
+from collections import namedtuple
+
+# Telemetry of one playback
+FrameStats = namedtuple("FrameStats", [
+    "frames",          # frames drawn
+    "ops",             # trace operations covered
+    "seconds",         # wall time of the playback
+    "ops_per_frame",   # mean operations batched into one frame
+    "mean_frame_ms",   # mean draw time per frame
+    "max_frame_ms",    # slowest frame
+    "fps",             # achieved frames per second
+])
+
+class FrameScheduler:
+    """Plays a TracePlayer to a wall-clock schedule instead of one step per sleep.
+
+    The playback lasts ``duration`` seconds, or ``len(player) / ops_per_second``
+    when no duration is given, and never draws more than ``fps`` frames per
+    second. Each frame advances the player to where the schedule says it
+    should be when that frame appears, so the operations batched per frame
+    grow automatically when drawing is slow or the trace is long. ``fps`` is
+    read every frame, so another thread may retune it during playback.
+    """
+
+    def __init__(self, duration=None, ops_per_second=None, fps=30, clock=time.perf_counter, sleep=time.sleep):
+        self.duration = duration
+        self.ops_per_second = ops_per_second
+        self.fps = fps
+        self.clock = clock
+        self.sleep = sleep
+
+    def duration_for(self, total_ops):
+        if self.duration is not None:
+            return self.duration
+        if self.ops_per_second:
+            return total_ops / self.ops_per_second
+        return 0.0
+
+    def play(self, player, plot_spot=None, draw_func=None, stop=None):
+        total = len(player)
+        duration = self.duration_for(total - player.position)
+        origin = player.position
+        start = self.clock()
+        frame_times = []
+
+        while player.position < total:
+            if stop is not None and stop.is_set():
+                break
+            frame_start = self.clock()
+            frame_interval = 1.0 / self.fps
+            if duration > 0:
+                due = (frame_start - start + frame_interval) / duration
+                target = origin + math.ceil((total - origin) * min(due, 1.0))
+            else:
+                target = total
+            player.seek(max(target, player.position + 1))
+            if draw_func is not None:
+                draw_func(player.arr, plot_spot, player.highlight)
+            frame_end = self.clock()
+            frame_times.append(frame_end - frame_start)
+            remaining = frame_interval - (frame_end - frame_start)
+            if remaining > 0 and player.position < total:
+                self.sleep(remaining)
+
+        elapsed = self.clock() - start
+        frames = len(frame_times)
+        return FrameStats(
+            frames=frames,
+            ops=player.position - origin,
+            seconds=elapsed,
+            ops_per_frame=(player.position - origin) / frames if frames else 0.0,
+            mean_frame_ms=1000 * sum(frame_times) / frames if frames else 0.0,
+            max_frame_ms=1000 * max(frame_times) if frames else 0.0,
+            fps=frames / elapsed if elapsed > 0 else 0.0,
+        )
+
+def shared_fps(draw_seconds, panels, fps=30):
+    """Frame rate each of ``panels`` panels gets when one thread draws them all.
+
+    The drawing thread spends at most one second per second drawing, at
+    ``draw_seconds`` per frame, and no panel goes above ``fps``.
+    """
+    if draw_seconds <= 0:
+        return fps
+    return max(1.0, min(fps, 1.0 / (draw_seconds * panels)))
+
+_EMPTY = object()
+
+class FrameFanIn:
+    """Bounded, latest-frame-wins fan-in from several producer threads to one consumer.
+
+    Each producer owns a single slot. ``publish`` blocks while the producer's
+    previous frame has not been collected yet, so producers can never run
+    ahead of the renderer and memory stays flat at any speed; a producer
+    driven by a FrameScheduler then simply skips ahead to wherever the clock
+    says it should be. ``cancel`` releases every blocked producer and makes
+    the consumer return.
+    """
+
+    def __init__(self, producers):
+        self.stop = threading.Event()
+        self._cond = threading.Condition()
+        self._slots = [_EMPTY] * producers
+        self._open = producers
+
+    def publish(self, index, frame):
+        with self._cond:
+            while self._slots[index] is not _EMPTY and not self.stop.is_set():
+                self._cond.wait()
+            if self.stop.is_set():
+                return False
+            self._slots[index] = frame
+            self._cond.notify_all()
+            return True
+
+    def close(self, index):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify_all()
+
+    def collect(self):
+        """Wait for pending frames and return ``{index: frame}``, or None once all producers closed."""
+        with self._cond:
+            while (
+                not self.stop.is_set()
+                and self._open > 0
+                and all(slot is _EMPTY for slot in self._slots)
+            ):
+                self._cond.wait()
+            frames = {i: slot for i, slot in enumerate(self._slots) if slot is not _EMPTY}
+            self._slots = [_EMPTY] * len(self._slots)
+            self._cond.notify_all()
+            if self.stop.is_set() or not frames:
+                return None
+            return frames
+
+    def cancel(self):
+        self.stop.set()
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,64 @@
+import numpy as np
+
+from tracer import SWAP
+
+# Columns drawn per chart, roughly one per pixel of a half-width panel
+BINS = 400
+
+def bin_edges(n, bins=BINS):
+    """Start offsets of ``min(bins, n)`` near-equal bins over ``n`` elements, plus ``n``."""
+    bins = max(1, min(bins, n))
+    return np.arange(bins + 1, dtype=np.int64) * n // bins
+
+def envelope(arr, bins=BINS):
+    """Return ``(mins, maxs)`` of ``arr`` over ``bin_edges(len(arr), bins)``."""
+    values = np.asarray(arr, dtype=np.int64)
+    starts = bin_edges(len(values), bins)[:-1]
+    if not len(values):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts)
+
+class Envelope:
+    """Min/max envelope of a TracePlayer's array, kept up to date as it plays.
+
+    Each frame only the bins touched by the operations played since the last
+    update are recomputed, so the cost per frame follows the number of
+    changed bins rather than the array length, and the payload sent to the
+    browser is always ``bins`` columns.
+    """
+
+    def __init__(self, player, bins=BINS):
+        self.player = player
+        trace = player.trace
+        self.n = len(trace.initial)
+        self.edges = bin_edges(self.n, bins)
+        self.ops = np.frombuffer(trace.ops, dtype=np.int8)
+        self.first = np.frombuffer(trace.first, dtype=np.int64)
+        self.second = np.frombuffer(trace.second, dtype=np.int64)
+        self.position = player.position
+        self.mins, self.maxs = envelope(player.arr, bins)
+
+    def _values(self):
+        # A zero-copy view; the player swaps in a new buffer on backward seeks
+        return np.frombuffer(self.player.arr, dtype=np.int64)
+
+    def bin_of(self, index):
+        return int(np.searchsorted(self.edges, index, side="right")) - 1
+
+    def update(self):
+        start, stop = self.position, self.player.position
+        self.position = stop
+        if start == stop:
+            return
+        values = self._values()
+        if stop < start or stop - start > len(self.mins):
+            self.mins, self.maxs = envelope(values, len(self.mins))
+            return
+        touched = self.first[start:stop]
+        swaps = self.ops[start:stop] == SWAP
+        if swaps.any():
+            touched = np.concatenate([touched, self.second[start:stop][swaps]])
+        for b in np.unique(np.searchsorted(self.edges, touched, side="right") - 1):
+            lo, hi = self.edges[b], self.edges[b + 1]
+            self.mins[b] = values[lo:hi].min()
+            self.maxs[b] = values[lo:hi].max()
@@ -0,0 +1,97 @@
+import time
+import tracemalloc
+from collections import namedtuple
+
+from tracer import Counter
+
+# One structured record per algorithm run. Fields that were not measured are None.
+RunRecord = namedtuple("RunRecord", [
+    "loops",        # the algorithm's own loop_count
+    "space",        # the algorithm's own space_count
+    "comparisons",  # element comparisons
+    "swaps",        # element swaps
+    "writes",       # single-element writes
+    "max_depth",    # deepest recursion level
+    "peak_bytes",   # peak auxiliary memory seen by tracemalloc
+    "seconds",      # wall time of an uninstrumented run
+])
+
+# Titles used when charting a field
+METRICS = {
+    "loops": "Loop Count (Time Complexity)",
+    "space": "Temporary Space Used (Space Complexity)",
+    "comparisons": "Comparisons",
+    "swaps": "Swaps",
+    "writes": "Element Writes",
+    "max_depth": "Max Recursion Depth",
+    "peak_bytes": "Peak Auxiliary Memory (bytes)",
+    "seconds": "Wall Time (s)",
+}
+
+# Roughly how much slower a pure-Python sort runs under tracemalloc
+TRACEMALLOC_SLOWDOWN = 40
+# Seconds a tracemalloc run may be expected to take before peak memory is skipped
+MEMORY_BUDGET = 5.0
+# Length of the untimed warm-up run on a prefix of the input
+WARMUP_ITEMS = 16
+
+def measure(func, arr, counters=True, memory=True, timing=True, recorder=None, memory_budget=MEMORY_BUDGET):
+    """Run ``func`` on copies of ``arr`` and return ``(sorted_arr, RunRecord)``.
+
+    Each measurement has a run of its own, so none pays for another's
+    overhead: the counts come from a run with a recorder attached, the wall
+    time from a bare run, and the peak memory from a run under tracemalloc
+    with no recorder. Pass a ``recorder`` such as a Trace to count with it
+    instead of a fresh Counter, so recording the trace costs no extra run.
+
+    tracemalloc hooks every allocation, including the ints a loop counter
+    creates, and slows a Python sort down about ``TRACEMALLOC_SLOWDOWN``
+    times. When the timed run says that would take more than
+    ``memory_budget`` seconds, ``peak_bytes`` is left as None; pass None to
+    always measure it.
+
+    The timed run follows an untimed one on the first ``WARMUP_ITEMS``
+    items, so one-off costs such as the lazy numpy import of a fast path
+    are not billed to it.
+    """
+    sorted_arr, loops, space = None, None, None
+    counter = None
+    if counters:
+        counter = Counter() if recorder is None else recorder
+        sorted_arr, loops, space = func(list(arr), trace=counter)
+
+    seconds = None
+    if timing:
+        func(list(arr[:WARMUP_ITEMS]))
+        work = list(arr)
+        start = time.perf_counter()
+        sorted_arr, loops, space = func(work)
+        seconds = time.perf_counter() - start
+
+    peak = None
+    if memory and (memory_budget is None or seconds is None or seconds * TRACEMALLOC_SLOWDOWN <= memory_budget):
+        work = list(arr)
+        # Leave an outer tracemalloc session (e.g. a profiler) running
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            sorted_arr, loops, space = func(work)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    record = RunRecord(
+        loops=loops,
+        space=space,
+        comparisons=counter.comparisons if counter else None,
+        swaps=counter.swaps if counter else None,
+        writes=counter.writes if counter else None,
+        max_depth=counter.max_depth if counter else None,
+        peak_bytes=peak,
+        seconds=seconds,
+    )
+    return sorted_arr, record
@@ -0,0 +1,292 @@
+import math
+import multiprocessing as mp
+import os
+from collections import namedtuple
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from scheduler import _context
+from sorting import _assign
+
+# Below this many elements starting a pool costs more than it saves
+PARALLEL_THRESHOLD = 1 << 15
+# Sample elements drawn per bucket when picking sample sort's splitters
+OVERSAMPLING = 32
+
+# --- Worker side ---
+_shm = None
+# Two int64 rows of the array's length: the data and a scratch buffer. Only
+# pool workers use this; the in-process path passes its own views to each call,
+# so sorts in concurrent threads never share buffers.
+_views = None
+
+def _attach(shm_name, n):
+    global _shm, _views
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _views = np.ndarray((2, n), dtype=np.int64, buffer=_shm.buf)
+
+class _Window:
+    """Recorder for a sort running on a copy of ``arr[low:]``.
+
+    Shifts indices into the whole array and mirrors every mutation into
+    ``arr``, so the caller's list and trace see the same steps.
+    """
+
+    def __init__(self, trace, arr, low):
+        self.trace = trace
+        self.arr = arr
+        self.low = low
+
+    def compare(self, i, j):
+        self.trace.compare(self.low + i, self.low + j)
+
+    def swap(self, i, j):
+        i, j = self.low + i, self.low + j
+        self.arr[i], self.arr[j] = self.arr[j], self.arr[i]
+        self.trace.swap(i, j)
+
+    def write(self, k, value):
+        self.arr[self.low + k] = value
+        self.trace.write(self.low + k, value)
+
+    def enter(self):
+        self.trace.enter()
+
+    def leave(self):
+        self.trace.leave()
+
+def _sort_block(task, views=None, trace=None, arr=None):
+    func, row, low, high = task
+    view = (_views if views is None else views)[row]
+    values = view[low:high].tolist()
+    _, loops, space = func(values, trace=None if trace is None else _Window(trace, arr, low))
+    view[low:high] = values
+    return loops, space
+
+def _merge_piece(task, views=None, trace=None, arr=None):
+    # Merge src[a:a_end] and src[b:b_end] into dst from ``out``; ties take the left run first
+    src, a, a_end, b, b_end, out = task
+    views = _views if views is None else views
+    left = views[src][a:a_end].tolist()
+    right = views[src][b:b_end].tolist()
+    merged = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if right[j] < left[i]:
+            merged.append(right[j])
+            j += 1
+        else:
+            merged.append(left[i])
+            i += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    views[1 - src][out:out + len(merged)] = merged
+    if trace is not None:
+        for k, value in enumerate(merged, out):
+            arr[k] = value
+            trace.write(k, value)
+    return len(merged)
+
+def _classify(task, views=None, trace=None, arr=None):
+    splitters, low, high = task
+    views = _views if views is None else views
+    buckets = np.searchsorted(splitters, views[0][low:high], side="right")
+    return np.bincount(buckets, minlength=len(splitters) + 1)
+
+def _scatter(task, views=None, trace=None, arr=None):
+    # Move a block into the scratch row, bucket by bucket, keeping input order within a bucket
+    splitters, low, high, offsets = task
+    views = _views if views is None else views
+    block = views[0][low:high]
+    buckets = np.searchsorted(splitters, block, side="right")
+    order = np.argsort(buckets, kind="stable")
+    ranked = buckets[order]
+    dest = offsets[ranked] + np.arange(len(order)) - np.searchsorted(ranked, ranked)
+    values = block[order]
+    views[1][dest] = values
+    if trace is not None:
+        for k, value in zip(dest.tolist(), values.tolist()):
+            arr[k] = value
+            trace.write(k, value)
+
+# --- Parent side ---
+class _Workspace:
+    """The data and scratch rows, in shared memory when a pool works on them."""
+
+    def __init__(self, arr, workers, trace):
+        n = len(arr)
+        self.arr = arr
+        self.trace = trace
+        self.shm = None
+        self.pool = None
+        if workers > 1:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(2 * n, 1) * 8)
+            self.views = np.ndarray((2, n), dtype=np.int64, buffer=self.shm.buf)
+        else:
+            self.views = np.empty((2, n), dtype=np.int64)
+        self.views[0] = arr
+        if workers > 1:
+            self.pool = _context().Pool(workers, initializer=_attach, initargs=(self.shm.name, n))
+
+    def map(self, worker, tasks):
+        if self.pool is not None:
+            return self.pool.map(worker, tasks, chunksize=1)
+        # The in-process path runs the worker functions right here, on this workspace's views
+        return [worker(task, self.views, self.trace, self.arr) for task in tasks]
+
+    def store(self, row):
+        _assign(self.arr, self.views[row].tolist())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        del self.views
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+
+def _processes(processes):
+    return processes or os.cpu_count() or 1
+
+def _workers(n, processes, trace):
+    # A trace needs every step in order, and pool workers may not start pools of their own
+    if trace is not None or n < PARALLEL_THRESHOLD or mp.current_process().daemon:
+        return 1
+    return processes
+
+def _blocks(n, count):
+    edges = [n * k // count for k in range(count + 1)]
+    return [(edges[k], edges[k + 1]) for k in range(count) if edges[k] < edges[k + 1]]
+
+def _co_rank(k, left, right):
+    # How many of the first k merged elements come from ``left`` (ties favour left)
+    low, high = max(0, k - len(right)), min(k, len(left))
+    while low < high:
+        i = (low + high) // 2
+        if right[k - i - 1] >= left[i]:
+            low = i + 1
+        else:
+            high = i
+    return low
+
+def _merge_tasks(view, src, low, mid, high, pieces):
+    # Cut one merge into ``pieces`` independent slices of near-equal output length
+    left, right = view[low:mid], view[mid:high]
+    cuts = [(0, 0)]
+    for p in range(1, pieces):
+        k = (high - low) * p // pieces
+        i = _co_rank(k, left, right)
+        cuts.append((i, k - i))
+    cuts.append((mid - low, high - mid))
+    return [
+        (src, low + i0, low + i1, mid + j0, mid + j1, low + i0 + j0)
+        for (i0, j0), (i1, j1) in zip(cuts, cuts[1:])
+        if i1 + j1 > i0 + j0
+    ]
+
+def merge_sort(arr, trace=None, processes=None):
+    """Sort ``processes`` blocks with merge sort in parallel, then merge them pairwise.
+
+    Every merge round spreads its merges over all workers: each merge is cut
+    into slices at co-ranks found by binary search, so even the final merge
+    of two halves runs in parallel. Returns ``(arr, loops, space)``.
+    """
+    from sorting import merge_sort as local_sort
+
+    n = len(arr)
+    processes = _processes(processes)
+    runs = _blocks(n, processes)
+    loop_count = space_count = 0
+    with _Workspace(arr, _workers(n, processes, trace), trace) as ws:
+        for loops, space in ws.map(_sort_block, [(local_sort, 0, low, high) for low, high in runs]):
+            loop_count += loops
+            space_count += space
+        src = 0
+        levels = 0
+        while len(runs) > 1:
+            levels += 1
+            if trace is not None:
+                trace.enter()
+            tasks, merged = [], []
+            for k in range(0, len(runs) - 1, 2):
+                (low, mid), (_, high) = runs[k], runs[k + 1]
+                pieces = max(1, round(processes * (high - low) / n))
+                tasks.extend(_merge_tasks(ws.views[src], src, low, mid, high, pieces))
+                merged.append((low, high))
+            if len(runs) % 2:
+                # The odd run out moves to the other row unchanged
+                low, high = runs[-1]
+                ws.views[1 - src][low:high] = ws.views[src][low:high]
+                merged.append(runs[-1])
+            loop_count += sum(ws.map(_merge_piece, tasks))
+            space_count += n
+            runs = merged
+            src = 1 - src
+        if trace is not None:
+            for _ in range(levels):
+                trace.leave()
+        if trace is None:
+            ws.store(src)
+    return arr, loop_count, space_count
+
+def sample_sort(arr, trace=None, processes=None):
+    """Partition around sampled splitters into ``processes`` buckets and sort each in parallel.
+
+    The splitters are evenly spaced picks from a seeded random sample of
+    ``OVERSAMPLING`` elements per bucket. Workers count their block's bucket
+    sizes, scatter the block into the scratch row at the resulting offsets,
+    and finally intro-sort one bucket each. Returns ``(arr, loops, space)``.
+    """
+    from sorting import intro_sort as local_sort
+
+    n = len(arr)
+    if n < 2:
+        return arr, 0, 0
+    processes = _processes(processes)
+    blocks = _blocks(n, processes)
+    loop_count = space_count = 0
+    with _Workspace(arr, _workers(n, processes, trace), trace) as ws:
+        rng = np.random.default_rng(n)
+        sample = np.sort(rng.choice(ws.views[0], size=min(n, OVERSAMPLING * processes)))
+        splitters = sample[np.arange(1, processes) * len(sample) // processes]
+        counts = np.array(ws.map(_classify, [(splitters, low, high) for low, high in blocks]))
+        sizes = counts.sum(axis=0)
+        starts = np.cumsum(sizes) - sizes
+        offsets = starts + np.cumsum(counts, axis=0) - counts
+        ws.map(_scatter, [(splitters, low, high, offsets[b]) for b, (low, high) in enumerate(blocks)])
+        buckets = [(int(s), int(s + size)) for s, size in zip(starts, sizes) if size]
+        for loops, space in ws.map(_sort_block, [(local_sort, 1, low, high) for low, high in buckets]):
+            loop_count += loops
+            space_count += space
+        # Each element is placed by two binary searches over the splitters and moved once
+        loop_count += n * (2 * max(1, math.ceil(math.log2(processes))) + 1)
+        space_count += n + len(sample)
+        if trace is None:
+            ws.store(1)
+    return arr, loop_count, space_count
+
+# --- Scaling report ---
+Scaling = namedtuple("Scaling", ["algorithm", "n", "processes", "seconds", "speedup", "efficiency"])
+
+def scaling(name, data, cores, repeats=3):
+    """Time algorithm ``name`` on ``data`` at each process count in ``cores``.
+
+    Speedup is relative to the same algorithm on one process, and efficiency
+    is speedup per process. Pool start-up is part of every timing.
+    """
+    from benchmark import time_point
+    from sorting import ALGORITHMS
+
+    rows = []
+    for p in sorted(set(cores) | {1}):
+        _, seconds, _, _ = time_point(partial(ALGORITHMS[name], processes=p), data, repeats)
+        base = rows[0].seconds if rows else seconds
+        speedup = base / seconds if seconds else 0.0
+        rows.append(Scaling(name, len(data), p, seconds, speedup, speedup / p))
+    return rows
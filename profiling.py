@@ -0,0 +1,192 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+Phase = namedtuple("Phase", ["phase", "seconds", "calls", "share"])
+HotLine = namedtuple("HotLine", ["location", "function", "samples", "share"])
+
+class _RawStats:
+    # pstats.Stats loads anything with create_stats() and a stats dict,
+    # which is how stats sent back from a worker process are read
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def raw_stats(profile):
+    """The picklable stats dict of a finished cProfile.Profile, for sending between processes."""
+    profile.create_stats()
+    return profile.stats
+
+class Profiler:
+    """Opt-in attribution of wall time to named phases, with cProfile and sampled lines.
+
+    ``phase(name)`` times a block and ``timed(name, func)`` wraps a callable
+    so each call counts towards ``name``. Passing ``profile=key`` to
+    ``phase`` also runs cProfile over the block and merges the result into
+    the stats kept for ``key``, e.g. one per algorithm. While sampling, a
+    background thread records the deepest line of this repository on the
+    sampled thread's stack every ``interval`` seconds, so time spent inside
+    a library is charged to the line that called it.
+
+    A disabled profiler does nothing and wraps nothing.
+    """
+
+    def __init__(self, enabled=True, interval=0.001):
+        self.enabled = enabled
+        self.interval = interval
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.stats = {}
+        self.lines = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = None
+
+    # --- Phases ---
+    def add(self, name, seconds, calls=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.seconds[name] += seconds
+            self.calls[name] += calls
+
+    @contextmanager
+    def phase(self, name, profile=None):
+        if not self.enabled:
+            yield
+            return
+        profiler = cProfile.Profile() if profile is not None else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.add_stats(profile, raw_stats(profiler))
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, name, func):
+        if not self.enabled or func is None:
+            return func
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return wrapper
+
+    def add_stats(self, key, stats):
+        if not self.enabled:
+            return
+        loaded = pstats.Stats(_RawStats(stats))
+        with self._lock:
+            if key in self.stats:
+                self.stats[key].add(loaded)
+            else:
+                self.stats[key] = loaded
+
+    def add_unit(self, key, profile):
+        """Charge a scheduler UnitProfile to the worker and transfer phases and ``key``'s stats."""
+        if not self.enabled or profile is None:
+            return
+        # Workers run side by side, so this phase can exceed the wall time
+        self.add("compute (workers)", profile.seconds)
+        self.add("transfer", profile.transfer)
+        self.add_stats(key, profile.stats)
+
+    # --- Sampling ---
+    def start_sampling(self, thread_id=None):
+        if not self.enabled or self._sampler is not None:
+            return
+        target = threading.get_ident() if thread_id is None else thread_id
+        self._stop = threading.Event()
+
+        def sample():
+            while not self._stop.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                if frame is None:
+                    # The sampled thread has exited
+                    break
+                while frame is not None and not frame.f_code.co_filename.startswith(ROOT):
+                    frame = frame.f_back
+                with self._lock:
+                    self.samples += 1
+                    if frame is not None:
+                        path = os.path.relpath(frame.f_code.co_filename, ROOT)
+                        self.lines[(f"{path}:{frame.f_lineno}", frame.f_code.co_name)] += 1
+
+        self._sampler = threading.Thread(target=sample, daemon=True)
+        self._sampler.start()
+
+    def stop_sampling(self):
+        if self._sampler is None:
+            return
+        self._stop.set()
+        self._sampler.join()
+        self._sampler = None
+
+    @contextmanager
+    def sampling(self, thread_id=None):
+        self.start_sampling(thread_id)
+        try:
+            yield
+        finally:
+            self.stop_sampling()
+
+    # --- Reports ---
+    def report(self):
+        """Phases, slowest first; ``share`` is the fraction of all phase time."""
+        total = sum(self.seconds.values()) or 1.0
+        return [
+            Phase(name, seconds, self.calls[name], seconds / total)
+            for name, seconds in self.seconds.most_common()
+        ]
+
+    def hot_lines(self, limit=20):
+        total = self.samples or 1
+        return [
+            HotLine(location, function, count, count / total)
+            for (location, function), count in self.lines.most_common(limit)
+        ]
+
+    def top_functions(self, key, limit=15, sort="cumulative"):
+        """The pstats listing of ``key``'s heaviest functions, as text."""
+        out = io.StringIO()
+        stats = self.stats[key]
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def to_dict(self, limit=15):
+        return {
+            "phases": [p._asdict() for p in self.report()],
+            "hot_lines": [h._asdict() for h in self.hot_lines(limit)],
+            "samples": self.samples,
+            "profiles": {key: self.top_functions(key, limit) for key in self.stats},
+        }
+
+    def save(self, path, limit=15):
+        """Write the report as JSON, and each cProfile as ``<path stem>-<key>.prof`` beside it."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(limit), f, indent=2)
+        stem = os.path.splitext(path)[0]
+        for key, stats in self.stats.items():
+            slug = re.sub(r"[^a-z0-9]+", "-", str(key).lower()).strip("-")
+            stats.dump_stats(f"{stem}-{slug}.prof")
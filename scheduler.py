@@ -0,0 +1,155 @@
+import cProfile
+import math
+import multiprocessing as mp
+import os
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch import ENGINES, batch_sort
+from cache import fingerprint
+from metrics import MEMORY_BUDGET, RunRecord, measure
+from profiling import raw_stats
+from sorting import ALGORITHMS, COMPLEXITIES
+from tracer import Trace
+
+# One unit of work: run `algorithm` on the input identified by (size, case, seed)
+WorkUnit = namedtuple("WorkUnit", ["algorithm", "size", "case", "seed"])
+# A unit whose algorithm raised has no record or trace, and the exception as text in error
+UnitResult = namedtuple("UnitResult", ["record", "trace", "profile", "error"], defaults=[None, None])
+# Raw cProfile stats of a unit, its compute time in the worker and the time
+# its result spent in transfer back to the parent
+UnitProfile = namedtuple("UnitProfile", ["stats", "seconds", "transfer"])
+
+# --- Worker side ---
+_shm = None
+_buffer = None
+
+def _attach(shm_name, total):
+    global _shm, _buffer
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _buffer = np.ndarray((total,), dtype=np.int64, buffer=_shm.buf)
+
+def _run_unit(task):
+    unit, offset, length, record, instrument, profile = task
+    if not profile:
+        return unit, _compute_unit(unit, offset, length, record, instrument)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    result = profiler.runcall(_compute_unit, unit, offset, length, record, instrument)
+    # The send time stands in for the transfer until the parent receives it
+    result = result._replace(profile=UnitProfile(raw_stats(profiler), time.perf_counter() - start, time.time()))
+    return unit, result
+
+def evaluate(algorithm, arr, instrument=False, trace=None, memory_budget=MEMORY_BUDGET):
+    """The RunRecord of ``algorithm`` on the int64 array ``arr``; exceptions propagate.
+
+    A ``trace`` is filled in by one of the runs; when instrumenting, that
+    run also supplies the counts. ``memory_budget`` goes to ``measure``.
+    """
+    func = ALGORITHMS[algorithm]
+    if instrument:
+        return measure(func, arr.tolist(), recorder=trace, memory_budget=memory_budget)[1]
+    if trace is not None:
+        func(arr.tolist(), trace=trace)
+    if func in ENGINES:
+        # Counters only: the batch engine is far faster but has no timing or counts
+        _, loops, space = batch_sort(func, arr[None, :])
+        return RunRecord(int(loops[0]), int(space[0]), None, None, None, None, None, None)
+    return measure(func, arr.tolist(), counters=False, memory=False)[1]
+
+def _compute_unit(unit, offset, length, record, instrument):
+    arr = _buffer[offset:offset + length]
+    trace = Trace(arr.tolist(), record_compares=False) if record else None
+    try:
+        result = evaluate(unit.algorithm, arr, instrument, trace)
+    except Exception as e:
+        return UnitResult(None, None, error=f"{type(e).__name__}: {e}")
+    return UnitResult(result, trace)
+
+# --- Parent side ---
+def _context():
+    # Spawned workers would re-run __main__, which under Streamlit is the app script
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context()
+
+def estimate_cost(unit):
+    n = max(unit.size, 2)
+    func = ALGORITHMS[unit.algorithm]
+    if COMPLEXITIES[unit.algorithm] == "O(n²)" and func not in ENGINES:
+        return n * n
+    return n * math.log2(n)
+
+def run_units(units, inputs, processes=None, record=False, instrument=False, callback=None, cache=None, profile=False):
+    """Run every WorkUnit in a process pool and return ``{unit: UnitResult}``.
+
+    ``inputs`` maps ``(size, case, seed)`` to a 1-D integer array. All inputs
+    are packed once into a single shared-memory block that the workers map
+    directly, so no array is pickled per task. Units are dispatched longest
+    first; a unit whose algorithm raised maps to a UnitResult with only
+    ``error`` set.
+
+    ``instrument`` fills every RunRecord field instead of just the counters
+    and ``record`` also returns a Trace per unit. With a ResultCache, units
+    already cached are answered without running (unless traces are being
+    recorded) and new results are stored. ``profile`` runs every unit under
+    cProfile and attaches a UnitProfile; cached units carry none.
+    """
+    units = list(units)
+    all_units = units
+    cached = {}
+    if cache is not None:
+        digests = {key: fingerprint(inputs[key]) for key in {(u.size, u.case, u.seed) for u in units}}
+        cache_keys = {u: cache.key(u.algorithm, digests[(u.size, u.case, u.seed)]) for u in units}
+        if not record:
+            hits = cache.get_many(cache_keys.values())
+            for u in units:
+                hit = hits.get(cache_keys[u])
+                if hit is not None and (not instrument or hit.comparisons is not None):
+                    cached[u] = UnitResult(hit, None)
+                    if callback is not None:
+                        callback(u, cached[u])
+            units = [u for u in units if u not in cached]
+    if not units:
+        return {u: cached[u] for u in all_units}
+    keys = sorted({(u.size, u.case, u.seed) for u in units})
+    layout = {}
+    total = 0
+    for key in keys:
+        layout[key] = (total, len(inputs[key]))
+        total += len(inputs[key])
+
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+    try:
+        buffer = np.ndarray((total,), dtype=np.int64, buffer=shm.buf)
+        for key, (offset, length) in layout.items():
+            buffer[offset:offset + length] = inputs[key]
+        del buffer
+
+        ordered = sorted(units, key=estimate_cost, reverse=True)
+        tasks = [(u,) + layout[(u.size, u.case, u.seed)] + (record, instrument, profile) for u in ordered]
+        processes = processes or min(os.cpu_count() or 1, len(tasks))
+
+        results = {}
+        with _context().Pool(processes, initializer=_attach, initargs=(shm.name, total)) as pool:
+            for unit, result in pool.imap_unordered(_run_unit, tasks):
+                if result.profile is not None:
+                    sent = result.profile.transfer
+                    result = result._replace(profile=result.profile._replace(transfer=time.time() - sent))
+                results[unit] = result
+                if callback is not None:
+                    callback(unit, result)
+        if cache is not None:
+            cache.put_many({
+                cache_keys[u]: r.record
+                for u, r in results.items() if r.error is None
+            })
+        results.update(cached)
+        # Gather in submission order so callers never see completion order
+        return {u: results[u] for u in all_units}
+    finally:
+        shm.close()
+        shm.unlink()
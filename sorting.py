@@ -1,156 +1,741 @@
-from utils import visualize_sorting
+from tracer import LiveRecorder
 
-def bubble_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None):
+def _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func):
+    # An explicit trace wins; otherwise fall back to drawing every step live
+    if trace is None and visualization:
+        return LiveRecorder(arr, speed, plot_spot, draw_func, beep_func)
+    return trace
+
+# --- Shared helpers ---
+def _swap(arr, i, j, trace):
+    arr[i], arr[j] = arr[j], arr[i]
+    if trace is not None:
+        trace.swap(i, j)
+
+def _insertion_range(arr, low, high, trace):
+    # Insertion sort of arr[low..high]; returns the number of shifts
+    loop_count = 0
+    for i in range(low + 1, high + 1):
+        while i > low:
+            if trace is not None:
+                trace.compare(i - 1, i)
+            if arr[i - 1] <= arr[i]:
+                break
+            loop_count += 1
+            arr[i - 1], arr[i] = arr[i], arr[i - 1]
+            i -= 1
+            if trace is not None:
+                trace.swap(i, i + 1)
+    return loop_count
+
+def _sift_down(arr, low, root, size, trace):
+    # Sift-down in the heap stored at arr[low:low + size]; returns the levels visited
+    levels = 1
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            break
+        if child + 1 < size:
+            if trace is not None:
+                trace.compare(low + child + 1, low + child)
+            if arr[low + child + 1] > arr[low + child]:
+                child += 1
+        if trace is not None:
+            trace.compare(low + child, low + root)
+        if arr[low + child] <= arr[low + root]:
+            break
+        arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+        if trace is not None:
+            trace.swap(low + child, low + root)
+        root = child
+        levels += 1
+    return levels
+
+def _heap_range(arr, low, high, trace):
+    # Heap sort of arr[low..high]; returns the sift-down levels visited
+    size = high - low + 1
+    loop_count = 0
+    for root in range(size // 2 - 1, -1, -1):
+        loop_count += _sift_down(arr, low, root, size, trace)
+    for end in range(size - 1, 0, -1):
+        arr[low], arr[low + end] = arr[low + end], arr[low]
+        if trace is not None:
+            trace.swap(low + end, low)
+        loop_count += _sift_down(arr, low, 0, end, trace)
+    return loop_count
+
+def _merge_runs(arr, low, mid, high, scratch, trace):
+    # Merge the sorted runs arr[low:mid] and arr[mid:high]. Only the left run
+    # is copied out, into the caller's scratch buffer; the right one is
+    # consumed in place.
+    width = mid - low
+    for i in range(width):
+        scratch[i] = arr[low + i]
+    i, j, k = 0, mid, low
+    while i < width and j < high:
+        if trace is not None:
+            trace.compare(j, low + i)
+        if arr[j] < scratch[i]:
+            arr[k] = arr[j]
+            j += 1
+        else:
+            arr[k] = scratch[i]
+            i += 1
+        if trace is not None:
+            trace.write(k, arr[k])
+        k += 1
+    while i < width:
+        arr[k] = scratch[i]
+        i += 1
+        if trace is not None:
+            trace.write(k, arr[k])
+        k += 1
+
+def _assign(arr, values):
+    # Replace arr's contents in place, whether it is a list or an array.array
+    try:
+        arr[:] = values
+    except TypeError:
+        arr[:] = type(arr)(arr.typecode, values)
+
+def _fits_int64(low, high):
+    return -(1 << 63) <= low and high < 1 << 63
+
+# --- Textbook sorts ---
+def bubble_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
     loop_count = 0
     n = len(arr)
     for i in range(n - 1):
         for j in range(0, n - i - 1):
             loop_count += 1
+            if trace is not None:
+                trace.compare(j, j + 1)
             if arr[j] > arr[j + 1]:
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                if visualization:
-                    visualize_sorting(arr, j, speed, plot_spot, draw_func, beep_func)
+                if trace is not None:
+                    trace.swap(j, j + 1)
     return arr, loop_count, 0
 
-def insertion_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None):
+def insertion_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
     loop_count = 0
     for i in range(1, len(arr)):
-        while i > 0 and arr[i - 1] > arr[i]:
+        while i > 0:
+            if trace is not None:
+                trace.compare(i - 1, i)
+            if arr[i - 1] <= arr[i]:
+                break
             loop_count += 1
             arr[i - 1], arr[i] = arr[i], arr[i - 1]
             i -= 1
-            if visualization:
-                visualize_sorting(arr, i, speed, plot_spot, draw_func, beep_func)
+            if trace is not None:
+                trace.swap(i, i + 1)
     return arr, loop_count, 0
 
-def selection_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None):
+def selection_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
     loop_count = 0
     for i in range(len(arr)):
         min_idx = i
         for j in range(i + 1, len(arr)):
             loop_count += 1
+            if trace is not None:
+                trace.compare(j, min_idx)
             if arr[j] < arr[min_idx]:
                 min_idx = j
         arr[i], arr[min_idx] = arr[min_idx], arr[i]
-        if visualization:
-            visualize_sorting(arr, i, speed, plot_spot, draw_func, beep_func)
+        if trace is not None:
+            trace.swap(i, min_idx)
     return arr, loop_count, 0
 
-def heapify(arr, n, i, speed, visualization, plot_spot, draw_func, beep_func, loop_info):
-    largest = i
-    l = 2 * i + 1
-    r = 2 * i + 2
-    loop_info['count'] += 1
-
-    if l < n and arr[l] > arr[largest]:
-        largest = l
-    if r < n and arr[r] > arr[largest]:
-        largest = r
-
-    if largest != i:
-        arr[i], arr[largest] = arr[largest], arr[i]
-        if visualization:
-            visualize_sorting(arr, largest, speed, plot_spot, draw_func, beep_func)
-        heapify(arr, n, largest, speed, visualization, plot_spot, draw_func, beep_func, loop_info)
+def heap_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    # Iterative sift-down: one loop level per heap level instead of a call
+    loop_count = _heap_range(arr, 0, len(arr) - 1, trace)
+    return arr, loop_count, 0
 
-def heap_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None):
-    n = len(arr)
-    loop_info = {'count': 0}
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i, speed, visualization, plot_spot, draw_func, beep_func, loop_info)
-    for i in range(n - 1, 0, -1):
-        arr[i], arr[0] = arr[0], arr[i]
-        if visualization:
-            visualize_sorting(arr, i, speed, plot_spot, draw_func, beep_func)
-        heapify(arr, i, 0, speed, visualization, plot_spot, draw_func, beep_func, loop_info)
-    return arr, loop_info['count'], 0
-
-def quick_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, median3=False):
-    loop_count = {'count': 0}
+def quick_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, median3=False, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    loop_count = 0
 
     def partition(array, low, high):
+        nonlocal loop_count
         if median3:
             mid = (low + high) // 2
             # Find pivot index and move it to the end (array[high])
             candidates = [(array[low], low), (array[mid], mid), (array[high], high)]
             _, pivot_index = sorted(candidates)[1]
             array[pivot_index], array[high] = array[high], array[pivot_index]
-            
+            if trace is not None and pivot_index != high:
+                trace.swap(high, pivot_index)
+
             # pivot_index = random.randint(low, high)
             pivot = array[high] # or low or pivot index
 
         else:
             pivot = array[high]
+        # The scan below runs exactly high - low times
+        loop_count += high - low
         i = low - 1
         for j in range(low, high):
-            loop_count['count'] += 1
+            if trace is not None:
+                trace.compare(j, high)
             if array[j] <= pivot:
                 i += 1
                 array[i], array[j] = array[j], array[i]
-                if visualization:
-                    visualize_sorting(array, j, speed, plot_spot, draw_func, beep_func)
+                if trace is not None:
+                    trace.swap(j, i)
         array[i + 1], array[high] = array[high], array[i + 1]
-        if visualization:
-            visualize_sorting(array, i + 1, speed, plot_spot, draw_func, beep_func)
+        if trace is not None:
+            trace.swap(i + 1, high)
         return i + 1
 
-    def quicksort(array, low, high):
+    # Explicit stack of pending ranges. The larger side is pushed and the
+    # smaller one partitioned next, so at most log2(n) ranges are pending.
+    stack = []
+    low, high = 0, len(arr) - 1
+    while True:
         if low < high:
-            pi = partition(array, low, high)
-            quicksort(array, low, pi - 1)
-            quicksort(array, pi + 1, high)
-
-    quicksort(arr, 0, len(arr) - 1)
-    return arr, loop_count['count'], 0
-
-def quick_sort_median3(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None):
-    return quick_sort(arr, speed, visualization, plot_spot, draw_func, beep_func, median3=True)
-
-def merge_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None):
-    loop_count = {'count': 0}
-    space_count = {'count': 0}
-
-    def merge(array, left, mid, right):
-        L = array[left:mid + 1]
-        R = array[mid + 1:right + 1]
-        space_count['count'] += len(L) + len(R)
-        i = j = 0
-        k = left
-
-        while i < len(L) and j < len(R):
-            loop_count['count'] += 1
-            if L[i] <= R[j]:
-                array[k] = L[i]
-                i += 1
+            pi = partition(arr, low, high)
+            if pi - low < high - pi:
+                stack.append((pi + 1, high))
+                high = pi - 1
             else:
-                array[k] = R[j]
-                j += 1
-            if visualization:
-                visualize_sorting(array, k, speed, plot_spot, draw_func, beep_func)
-            k += 1
-
-        while i < len(L):
-            loop_count['count'] += 1
-            array[k] = L[i]
+                stack.append((low, pi - 1))
+                low = pi + 1
+            if trace is not None:
+                trace.enter()
+        elif stack:
+            low, high = stack.pop()
+            if trace is not None:
+                trace.leave()
+        else:
+            break
+    return arr, loop_count, 0
+
+def quick_sort_median3(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    return quick_sort(arr, speed, visualization, plot_spot, draw_func, beep_func, median3=True, trace=trace)
+
+def merge_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None, scratch=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    # Bottom-up passes over runs of width 1, 2, 4, ... share one buffer;
+    # pass a list of at least len(arr) items as scratch to reuse it across calls
+    n = len(arr)
+    if scratch is None or len(scratch) < n:
+        scratch = [0] * n
+    # Every merge writes each element of its range once and copies its left run once
+    loop_count = 0
+    space_count = 0
+    width = 1
+    levels = 0
+    while width < n:
+        levels += 1
+        if trace is not None:
+            trace.enter()
+        for low in range(0, n - width, 2 * width):
+            mid = low + width
+            high = min(low + 2 * width, n)
+            _merge_runs(arr, low, mid, high, scratch, trace)
+            loop_count += high - low
+            space_count += width
+        width *= 2
+    if trace is not None:
+        for _ in range(levels):
+            trace.leave()
+    return arr, loop_count, space_count
+
+# --- Hybrid sorts ---
+# Slices at most this long are finished by insertion sort
+INSERTION_CUTOFF = 16
+# Natural runs shorter than this are extended by insertion sort before merging
+MIN_RUN = 32
+
+def _order3(arr, low, mid, high, trace):
+    # Sort the three samples in place so the median lands on mid and the
+    # ends act as sentinels; sorted and reversed input stay balanced
+    for a, b in ((low, mid), (mid, high), (low, mid)):
+        if trace is not None:
+            trace.compare(b, a)
+        if arr[b] < arr[a]:
+            _swap(arr, a, b, trace)
+
+def _partition(arr, low, high, trace):
+    # Hoare partition around the median of three.
+    # Returns (split, scans) with arr[low..split] <= arr[split + 1..high].
+    mid = (low + high) // 2
+    _order3(arr, low, mid, high, trace)
+    pivot = arr[mid]
+    i, j = low - 1, high + 1
+    scans = 0
+    while True:
+        i += 1
+        scans += 1
+        if trace is not None:
+            trace.compare(i, mid)
+        while arr[i] < pivot:
             i += 1
-            if visualization:
-                visualize_sorting(array, k, speed, plot_spot, draw_func, beep_func)
-            k += 1
+            scans += 1
+            if trace is not None:
+                trace.compare(i, mid)
+        j -= 1
+        scans += 1
+        if trace is not None:
+            trace.compare(j, mid)
+        while arr[j] > pivot:
+            j -= 1
+            scans += 1
+            if trace is not None:
+                trace.compare(j, mid)
+        if i >= j:
+            return j, scans
+        _swap(arr, i, j, trace)
 
-        while j < len(R):
-            loop_count['count'] += 1
-            array[k] = R[j]
-            j += 1
-            if visualization:
-                visualize_sorting(array, k, speed, plot_spot, draw_func, beep_func)
-            k += 1
-
-    def mergesort(array, left, right):
-        if left < right:
-            mid = (left + right) // 2
-            mergesort(array, left, mid)
-            mergesort(array, mid + 1, right)
-            merge(array, left, mid, right)
-
-    mergesort(arr, 0, len(arr) - 1)
-    return arr, loop_count['count'], space_count['count']
\ No newline at end of file
+def _partition3(arr, low, high, trace):
+    # Bentley-McIlroy three-way partition. Keys equal to the pivot are parked at
+    # both ends during the scan and swapped into the middle afterwards.
+    # Returns (lt, gt, scans) with arr[lt..gt] equal to the pivot.
+    mid = (low + high) // 2
+    _order3(arr, low, mid, high, trace)
+    _swap(arr, low, mid, trace)
+    pivot = arr[low]
+    i, j = low, high + 1
+    p, q = low, high + 1
+    scans = 0
+    while True:
+        i += 1
+        while True:
+            scans += 1
+            if trace is not None:
+                trace.compare(i, low)
+            if not arr[i] < pivot or i == high:
+                break
+            i += 1
+        j -= 1
+        while True:
+            scans += 1
+            if trace is not None:
+                trace.compare(j, low)
+            if not pivot < arr[j] or j == low:
+                break
+            j -= 1
+        if i == j and arr[i] == pivot:
+            p += 1
+            _swap(arr, p, i, trace)
+        if i >= j:
+            break
+        _swap(arr, i, j, trace)
+        if arr[i] == pivot:
+            p += 1
+            _swap(arr, p, i, trace)
+        if arr[j] == pivot:
+            q -= 1
+            _swap(arr, q, j, trace)
+    i = j + 1
+    for k in range(low, p + 1):
+        _swap(arr, j, k, trace)
+        j -= 1
+    for k in range(high, q - 1, -1):
+        _swap(arr, i, k, trace)
+        i += 1
+    return j + 1, i - 1, scans
+
+def intro_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    loop_count = 0
+
+    def introsort(low, high, depth):
+        nonlocal loop_count
+        if trace is not None:
+            trace.enter()
+        while high - low + 1 > INSERTION_CUTOFF:
+            if depth == 0:
+                # Too many unbalanced partitions: heap sort bounds the rest at n log n
+                loop_count += _heap_range(arr, low, high, trace)
+                break
+            depth -= 1
+            split, scans = _partition(arr, low, high, trace)
+            loop_count += scans
+            # Recurse into the smaller side and loop on the larger one
+            if split - low < high - split:
+                introsort(low, split, depth)
+                low = split + 1
+            else:
+                introsort(split + 1, high, depth)
+                high = split
+        if trace is not None:
+            trace.leave()
+
+    introsort(0, len(arr) - 1, 2 * len(arr).bit_length())
+    # Small slices are left unsorted but in place; one pass finishes them all
+    loop_count += _insertion_range(arr, 0, len(arr) - 1, trace)
+    return arr, loop_count, 0
+
+def three_way_quick_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    loop_count = 0
+
+    def quicksort(low, high):
+        nonlocal loop_count
+        if trace is not None:
+            trace.enter()
+        while high - low + 1 > INSERTION_CUTOFF:
+            lt, gt, scans = _partition3(arr, low, high, trace)
+            loop_count += scans
+            # Keys equal to the pivot are final; recurse into the smaller side
+            if lt - low < high - gt:
+                quicksort(low, lt - 1)
+                low = gt + 1
+            else:
+                quicksort(gt + 1, high)
+                high = lt - 1
+        loop_count += _insertion_range(arr, low, high, trace)
+        if trace is not None:
+            trace.leave()
+
+    quicksort(0, len(arr) - 1)
+    return arr, loop_count, 0
+
+def natural_merge_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None, scratch=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    n = len(arr)
+    if scratch is None or len(scratch) < n:
+        scratch = [0] * n
+    loop_count = 0
+    space_count = 0
+
+    # Split the input into ascending runs, reversing strictly descending ones
+    runs = []
+    low = 0
+    while low < n:
+        high = low + 1
+        if high < n:
+            if trace is not None:
+                trace.compare(high, low)
+            descending = arr[high] < arr[low]
+            high += 1
+            while high < n:
+                if trace is not None:
+                    trace.compare(high, high - 1)
+                if (arr[high] < arr[high - 1]) != descending:
+                    break
+                high += 1
+            if descending:
+                i, j = low, high - 1
+                while i < j:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    if trace is not None:
+                        trace.swap(i, j)
+                    i += 1
+                    j -= 1
+        loop_count += high - low
+        end = min(n, low + MIN_RUN)
+        if high < end:
+            loop_count += _insertion_range(arr, low, end - 1, trace)
+            high = end
+        runs.append((low, high))
+        low = high
+
+    def merge(low, mid, high):
+        nonlocal loop_count, space_count
+        # Runs that already follow each other need no merge
+        if trace is not None:
+            trace.compare(mid, mid - 1)
+        if arr[mid - 1] <= arr[mid]:
+            return
+        _merge_runs(arr, low, mid, high, scratch, trace)
+        loop_count += high - low
+        space_count += mid - low
+
+    # Merge neighbouring runs pairwise until one remains; each pass is one level deeper
+    levels = 0
+    while len(runs) > 1:
+        levels += 1
+        if trace is not None:
+            trace.enter()
+        merged = []
+        for k in range(0, len(runs) - 1, 2):
+            (low, mid), (_, high) = runs[k], runs[k + 1]
+            merge(low, mid, high)
+            merged.append((low, high))
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+    if trace is not None:
+        for _ in range(levels):
+            trace.leave()
+    return arr, loop_count, space_count
+
+# --- Adaptive sorts ---
+# Quadratic in the worst case but linear on sorted input: each stops once a
+# pass finds nothing out of order.
+def adaptive_bubble_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    loop_count = 0
+    # Everything after a pass's last swap is in place, so the next pass stops there
+    bound = len(arr) - 1
+    while bound > 0:
+        last = 0
+        for j in range(bound):
+            loop_count += 1
+            if trace is not None:
+                trace.compare(j, j + 1)
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                if trace is not None:
+                    trace.swap(j, j + 1)
+                last = j
+        bound = last
+    return arr, loop_count, 0
+
+def cocktail_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    loop_count = 0
+    # Alternate forward and backward passes, each shrinking its end of the
+    # unsorted window to where it last swapped
+    low, high = 0, len(arr) - 1
+    while low < high:
+        last = low
+        for j in range(low, high):
+            loop_count += 1
+            if trace is not None:
+                trace.compare(j, j + 1)
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                if trace is not None:
+                    trace.swap(j, j + 1)
+                last = j
+        high = last
+        for j in range(high, low, -1):
+            loop_count += 1
+            if trace is not None:
+                trace.compare(j - 1, j)
+            if arr[j - 1] > arr[j]:
+                arr[j - 1], arr[j] = arr[j], arr[j - 1]
+                if trace is not None:
+                    trace.swap(j - 1, j)
+                last = j
+        low = last
+    return arr, loop_count, 0
+
+def binary_insertion_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    loop_count = 0
+    for i in range(1, len(arr)):
+        # One comparison with the previous element settles an element already in order
+        loop_count += 1
+        if trace is not None:
+            trace.compare(i - 1, i)
+        key = arr[i]
+        if arr[i - 1] <= key:
+            continue
+        # Find the first element of arr[:i - 1] greater than key, so equal keys keep their order
+        low, high = 0, i - 1
+        while low < high:
+            mid = (low + high) // 2
+            loop_count += 1
+            if trace is not None:
+                trace.compare(mid, i)
+            if key < arr[mid]:
+                high = mid
+            else:
+                low = mid + 1
+        arr[low + 1:i + 1] = arr[low:i]
+        loop_count += i - low
+        if trace is not None:
+            for k in range(i, low, -1):
+                trace.write(k, arr[k])
+        arr[low] = key
+        if trace is not None:
+            trace.write(low, key)
+    return arr, loop_count, 0
+
+# --- Non-comparison sorts ---
+# Integer keys only. Without a recorder attached, counting and radix sort take
+# a NumPy path with the same counters as the step-by-step one.
+# Key ranges wider than this would need more counters than the input is worth
+MAX_COUNTING_RANGE = 1 << 24
+RADIX_BITS = 8
+RADIX = 1 << RADIX_BITS
+
+def counting_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    n = len(arr)
+    if n == 0:
+        return arr, 0, 0
+    low, high = min(arr), max(arr)
+    k = high - low + 1
+    if k > MAX_COUNTING_RANGE:
+        raise ValueError(f"counting sort needs a key range of at most {MAX_COUNTING_RANGE:,}, got {k:,}")
+    # One pass counts every key, one pass over the counters writes them back
+    if trace is None and _fits_int64(low, high):
+        import numpy as np
+        counts = np.bincount(np.asarray(arr, dtype=np.int64) - low, minlength=k)
+        _assign(arr, np.repeat(np.arange(low, high + 1, dtype=np.int64), counts).tolist())
+        return arr, n + k, k
+    counts = [0] * k
+    for x in arr:
+        counts[x - low] += 1
+    pos = 0
+    for offset, count in enumerate(counts):
+        for _ in range(count):
+            arr[pos] = low + offset
+            if trace is not None:
+                trace.write(pos, arr[pos])
+            pos += 1
+    return arr, n + k, k
+
+def radix_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    n = len(arr)
+    if n == 0:
+        return arr, 0, 0
+    # LSD passes over base-256 digits of the keys shifted to start at zero,
+    # which also handles negative numbers
+    low, high = min(arr), max(arr)
+    passes = -(-(high - low).bit_length() // RADIX_BITS)
+    # Per pass: a digit histogram over the input, its prefix sums, and a stable scatter
+    loop_count = passes * (2 * n + RADIX)
+    space_count = n + RADIX
+    if trace is None and _fits_int64(low, high):
+        import numpy as np
+        keys = np.asarray(arr, dtype=np.int64) - low
+        for p in range(passes):
+            digits = ((keys >> (p * RADIX_BITS)) & (RADIX - 1)).astype(np.uint8)
+            counts = np.bincount(digits, minlength=RADIX)
+            # A digit every key shares leaves the order unchanged
+            if counts.max() < n:
+                keys = keys[np.argsort(digits, kind="stable")]
+        _assign(arr, (keys + low).tolist())
+        return arr, loop_count, space_count
+    scratch = [0] * n
+    for p in range(passes):
+        shift = p * RADIX_BITS
+        counts = [0] * RADIX
+        for x in arr:
+            counts[((x - low) >> shift) & (RADIX - 1)] += 1
+        starts = [0] * RADIX
+        for d in range(1, RADIX):
+            starts[d] = starts[d - 1] + counts[d - 1]
+        scratch[:] = arr
+        for x in scratch:
+            d = ((x - low) >> shift) & (RADIX - 1)
+            pos = starts[d]
+            starts[d] += 1
+            arr[pos] = x
+            if trace is not None:
+                trace.write(pos, x)
+    return arr, loop_count, space_count
+
+def bucket_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None, scratch=None):
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    n = len(arr)
+    if n < 2:
+        return arr, 0, 0
+    if scratch is None or len(scratch) < n:
+        scratch = [0] * n
+    # n buckets of equal width over [low, high]; uniform keys average one per bucket
+    low = min(arr)
+    width = -(-(max(arr) - low + 1) // n)
+    starts = [0] * (n + 1)
+    for x in arr:
+        starts[(x - low) // width + 1] += 1
+    for b in range(1, n + 1):
+        starts[b] += starts[b - 1]
+    scratch[:n] = arr
+    # Distribute in input order, so each bucket keeps its keys stable
+    for i in range(n):
+        x = scratch[i]
+        b = (x - low) // width
+        arr[starts[b]] = x
+        if trace is not None:
+            trace.write(starts[b], x)
+        starts[b] += 1
+    # Buckets are already in order relative to each other, so one insertion
+    # pass sorts inside every bucket at once and shifts no key across buckets
+    loop_count = 2 * n + _insertion_range(arr, 0, n - 1, trace)
+    return arr, loop_count, 2 * n
+
+# --- Parallel sorts ---
+# Both split the array across worker processes through shared memory; see
+# parallel.py. Traced, live and small runs take the same steps in-process.
+def parallel_merge_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None, processes=None):
+    import parallel
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    return parallel.merge_sort(arr, trace, processes)
+
+def sample_sort(arr, speed=0.1, visualization=False, plot_spot=None, draw_func=None, beep_func=None, trace=None, processes=None):
+    import parallel
+    trace = _recorder(arr, trace, speed, visualization, plot_spot, draw_func, beep_func)
+    return parallel.sample_sort(arr, trace, processes)
+
+# --- Registry shared by the app, the complexity sweep and worker processes ---
+ALGORITHMS = {
+    "Bubble Sort": bubble_sort,
+    "Insertion Sort": insertion_sort,
+    "Selection Sort": selection_sort,
+    "Merge Sort": merge_sort,
+    "Heap Sort": heap_sort,
+    "Quick Sort": quick_sort,
+    "Quick Sort (Median of 3)": quick_sort_median3,
+    "Intro Sort": intro_sort,
+    "Quick Sort (3-Way)": three_way_quick_sort,
+    "Natural Merge Sort": natural_merge_sort,
+    "Bubble Sort (Early Exit)": adaptive_bubble_sort,
+    "Cocktail Shaker Sort": cocktail_sort,
+    "Binary Insertion Sort": binary_insertion_sort,
+    "Parallel Merge Sort": parallel_merge_sort,
+    "Sample Sort": sample_sort,
+    "Counting Sort": counting_sort,
+    "Radix Sort (LSD)": radix_sort,
+    "Bucket Sort": bucket_sort,
+}
+
+# Algorithms that spread one sort over several processes
+PARALLEL = {"Parallel Merge Sort", "Sample Sort"}
+
+COMPLEXITIES = {
+    "Bubble Sort": "O(n²)",
+    "Insertion Sort": "O(n²)",
+    "Selection Sort": "O(n²)",
+    "Merge Sort": "O(n log n)",
+    "Heap Sort": "O(n log n)",
+    "Quick Sort": "O(n log n)",
+    "Quick Sort (Median of 3)": "O(n log n)",
+    "Intro Sort": "O(n log n)",
+    "Quick Sort (3-Way)": "O(n log n)",
+    "Natural Merge Sort": "O(n log n)",
+    "Bubble Sort (Early Exit)": "O(n²)",
+    "Cocktail Shaker Sort": "O(n²)",
+    "Binary Insertion Sort": "O(n²)",
+    "Parallel Merge Sort": "O(n log n)",
+    "Sample Sort": "O(n log n)",
+    "Counting Sort": "O(n + k)",
+    "Radix Sort (LSD)": "O(d(n + b))",
+    "Bucket Sort": "O(n + k)",
+}
+
+# Sorts that never compare two keys; they only take integers
+NON_COMPARISON = {"Counting Sort", "Radix Sort (LSD)", "Bucket Sort"}
+
+# Worst-case running time; the quick sorts degrade on adversarial or duplicate-heavy input
+WORST_CASE = {
+    "Bubble Sort": "O(n²)",
+    "Insertion Sort": "O(n²)",
+    "Selection Sort": "O(n²)",
+    "Merge Sort": "O(n log n)",
+    "Heap Sort": "O(n log n)",
+    "Quick Sort": "O(n²)",
+    "Quick Sort (Median of 3)": "O(n²)",
+    "Intro Sort": "O(n log n)",
+    "Quick Sort (3-Way)": "O(n²)",
+    "Natural Merge Sort": "O(n log n)",
+    "Bubble Sort (Early Exit)": "O(n²)",
+    "Cocktail Shaker Sort": "O(n²)",
+    "Binary Insertion Sort": "O(n²)",
+    "Parallel Merge Sort": "O(n log n)",
+    "Sample Sort": "O(n log n)",
+    "Counting Sort": "O(n + k)",
+    "Radix Sort (LSD)": "O(d(n + b))",
+    "Bucket Sort": "O(n²)",
+}
\ No newline at end of file
@@ -0,0 +1,230 @@
+import cProfile
+import json
+import os
+import time
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+
+from cache import code_version
+from datasets import load
+from metrics import MEMORY_BUDGET, RunRecord
+from profiling import raw_stats
+from scheduler import UnitProfile, _context, evaluate
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "complexity.jsonl")
+# Seconds one point may run before it is stopped, along with every larger size of its chain
+DEFAULT_TIMEOUT = 60.0
+
+# One measurement of a sweep: `algorithm` on seed `seed` of case `case` at size `n`
+Point = namedtuple("Point", ["case", "algorithm", "n", "seed"])
+# status is "ok", "error" (with the exception as text) or "timeout"
+PointResult = namedtuple("PointResult", ["point", "status", "record", "seconds", "error"])
+
+class ResultLog:
+    """Append-only JSON Lines file of finished sweep points.
+
+    Every result is written and flushed to disk as soon as it arrives, so an
+    interrupted sweep loses at most the points that were still running.
+    Lines are stamped with cache.code_version; on open, lines of
+    other versions and a last line cut short by a crash are ignored.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.version = code_version()
+        self.results = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("version") == self.version:
+                        result = self._decode(entry)
+                        self.results[result.point] = result
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a")
+
+    @staticmethod
+    def _decode(entry):
+        record = entry["record"]
+        return PointResult(
+            Point(**entry["point"]), entry["status"],
+            None if record is None else RunRecord(**record), entry["seconds"], entry["error"],
+        )
+
+    def get(self, point, instrument=False, timeout=None):
+        """The logged result of ``point``, or None if it still has to run.
+
+        A counters-only result does not count when ``instrument`` is set, nor
+        a timeout shorter than ``timeout``, so a larger budget retries it.
+        """
+        result = self.results.get(point)
+        if result is None:
+            return None
+        if result.status == "ok" and instrument and result.record.seconds is None:
+            return None
+        if result.status == "timeout" and timeout is not None and result.seconds < timeout:
+            return None
+        return result
+
+    def append(self, result):
+        entry = {
+            "version": self.version,
+            "point": result.point._asdict(),
+            "status": result.status,
+            "record": None if result.record is None else result.record._asdict(),
+            "seconds": result.seconds,
+            "error": result.error,
+        }
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.results[result.point] = result
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- Worker side ---
+def _run_point(conn, point, distribution, instrument, profile, memory_budget):
+    # Each point gets a process of its own, so one that overruns can be killed
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    try:
+        arr = load(distribution, point.n, point.seed)
+        if profiler is None:
+            record = evaluate(point.algorithm, arr, instrument, memory_budget=memory_budget)
+        else:
+            record = profiler.runcall(evaluate, point.algorithm, arr, instrument, memory_budget=memory_budget)
+        status, error = "ok", None
+    except Exception as e:
+        record, status, error = None, "error", f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+    stats = None if profiler is None else raw_stats(profiler)
+    conn.send((status, record, seconds, error, stats, time.time()))
+    conn.close()
+
+# --- Parent side ---
+class _Chain:
+    # The sizes of one (case, algorithm) pair, run smallest first
+    def __init__(self, case, algorithm, sizes):
+        self.case = case
+        self.algorithm = algorithm
+        self.sizes = deque(sizes)
+        self.running = 0
+        self.stopped = False
+
+def run_sweep(chains, distributions, log, processes=None, timeout=DEFAULT_TIMEOUT,
+              instrument=False, callback=None, profiler=None, memory_budget=MEMORY_BUDGET):
+    """Run the points of ``chains`` in worker processes, logging each result as it completes.
+
+    ``chains`` maps ``(case, algorithm)`` to ``[(n, seeds), ...]`` and
+    ``distributions`` maps a case to its datasets.py distribution. A chain
+    moves to its next size once every seed of the current one is done, and
+    stops for good when a point runs past ``timeout`` seconds, so each
+    algorithm runs up to whatever size exceeds the budget. Points already in
+    ``log`` are skipped, which resumes an interrupted sweep. ``callback`` is
+    called with every PointResult, logged or new, and once with None per
+    point skipped after a timeout. ``memory_budget`` goes to metrics.measure.
+    """
+    processes = processes or os.cpu_count() or 1
+    ctx = _context()
+    ready = deque()
+    active = {}
+
+    def advance(chain):
+        while chain.sizes:
+            n, seeds = chain.sizes.popleft()
+            points = [Point(chain.case, chain.algorithm, n, seed) for seed in range(seeds)]
+            todo = []
+            for point in points:
+                result = log.get(point, instrument, timeout)
+                if result is None:
+                    todo.append(point)
+                else:
+                    if result.status == "timeout":
+                        chain.stopped = True
+                    if callback is not None:
+                        callback(result)
+            if chain.stopped:
+                # The logged points of this size are reported; the rest never run
+                skip(chain, len(todo))
+                return
+            if todo:
+                ready.extend((chain, point) for point in todo)
+                chain.running = len(todo)
+                return
+
+    def skip(chain, count):
+        count += sum(seeds for _, seeds in chain.sizes)
+        chain.sizes.clear()
+        if callback is not None:
+            for _ in range(count):
+                callback(None)
+
+    def finish(chain, result):
+        log.append(result)
+        if callback is not None:
+            callback(result)
+        chain.running -= 1
+        if result.status == "timeout" and not chain.stopped:
+            chain.stopped = True
+            skip(chain, 0)
+        if chain.running == 0 and not chain.stopped:
+            advance(chain)
+
+    for (case, algorithm), sizes in chains.items():
+        advance(_Chain(case, algorithm, sizes))
+    try:
+        while ready or active:
+            while ready and len(active) < processes:
+                chain, point = ready.popleft()
+                if chain.stopped:
+                    # Another seed of this size timed out while this one waited
+                    chain.running -= 1
+                    if callback is not None:
+                        callback(None)
+                    continue
+                receiver, sender = ctx.Pipe(duplex=False)
+                proc = ctx.Process(
+                    target=_run_point, daemon=True,
+                    args=(sender, point, distributions[point.case], instrument, profiler is not None, memory_budget),
+                )
+                proc.start()
+                sender.close()
+                active[receiver] = (proc, chain, point, time.perf_counter())
+            if not active:
+                continue
+            deadline = min(start for _, _, _, start in active.values()) + timeout
+            for conn in wait(list(active), max(0.0, deadline - time.perf_counter())):
+                proc, chain, point, _ = active.pop(conn)
+                try:
+                    status, record, seconds, error, stats, sent = conn.recv()
+                except EOFError:
+                    status, record, seconds, error, stats, sent = "error", None, None, None, None, None
+                conn.close()
+                proc.join()
+                if status == "error" and error is None:
+                    error = f"worker exited with code {proc.exitcode}"
+                if stats is not None:
+                    profiler.add_unit(point.algorithm, UnitProfile(stats, seconds, time.time() - sent))
+                finish(chain, PointResult(point, status, record, seconds, error))
+            now = time.perf_counter()
+            for conn, (proc, chain, point, start) in list(active.items()):
+                if now - start >= timeout:
+                    del active[conn]
+                    proc.kill()
+                    proc.join()
+                    conn.close()
+                    finish(chain, PointResult(point, "timeout", None, now - start, None))
+    finally:
+        for proc, _, _, _ in active.values():
+            proc.kill()
+            proc.join()
@@ -0,0 +1,9 @@
+import pytest
+
+from datasets import generate
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 8, 9, 10, 11, 12, 13, 14, 15, 1000, 1002])
+def test_median3_killer_is_a_permutation(n):
+    # Covers both an even and an odd half length n // 2
+    out = generate("median3-killer", n).tolist()
+    assert sorted(out) == list(range(1, n + 1))
@@ -0,0 +1,195 @@
+from array import array
+
+from utils import visualize_sorting
+
+# --- Operation codes ---
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+
+
+class Counter:
+    """Recorder that only counts operations and tracks recursion depth.
+
+    Algorithms report every operation after it has been applied to the array
+    (``compare(i, j)``, ``swap(i, j)``, ``write(k, value)``) and bracket each
+    recursive call with ``enter()``/``leave()``. The other recorders extend
+    this one, so every recorder also counts.
+    """
+
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.depth = 0
+        self.max_depth = 0
+
+    def compare(self, i, j):
+        self.comparisons += 1
+
+    def swap(self, i, j):
+        self.swaps += 1
+
+    def write(self, k, value):
+        self.writes += 1
+
+    def enter(self):
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def leave(self):
+        self.depth -= 1
+
+
+class Trace(Counter):
+    """Compact, array-backed log of the operations a sort performed.
+
+    The first index of each operation is the one highlighted during playback.
+    """
+
+    def __init__(self, arr, record_compares=True):
+        super().__init__()
+        self.initial = array('q', arr)
+        self.ops = array('b')
+        self.first = array('q')
+        self.second = array('q')
+        self.record_compares = record_compares
+
+    def __len__(self):
+        return len(self.ops)
+
+    def compare(self, i, j):
+        self.comparisons += 1
+        if self.record_compares:
+            self.ops.append(COMPARE)
+            self.first.append(i)
+            self.second.append(j)
+
+    def swap(self, i, j):
+        self.swaps += 1
+        self.ops.append(SWAP)
+        self.first.append(i)
+        self.second.append(j)
+
+    def write(self, k, value):
+        self.writes += 1
+        self.ops.append(WRITE)
+        self.first.append(k)
+        self.second.append(value)
+
+
+class LiveRecorder(Counter):
+    """Recorder that draws every mutation as it happens (the legacy live path)."""
+
+    def __init__(self, arr, speed=0.1, plot_spot=None, draw_func=None, beep_func=None):
+        super().__init__()
+        self.arr = arr
+        self.speed = speed
+        self.plot_spot = plot_spot
+        self.draw_func = draw_func
+        self.beep_func = beep_func
+
+    def swap(self, i, j):
+        self.swaps += 1
+        visualize_sorting(self.arr, i, self.speed, self.plot_spot, self.draw_func, self.beep_func)
+
+    def write(self, k, value):
+        self.writes += 1
+        visualize_sorting(self.arr, k, self.speed, self.plot_spot, self.draw_func, self.beep_func)
+
+
+class TracePlayer:
+    """Replays a Trace at any speed without running the sort again.
+
+    The player can seek to any step in either direction. Seeking backwards
+    restores the nearest keyframe and replays forward from there. By default
+    a keyframe is kept every ``max(1024, n)`` operations, so the keyframes
+    together hold about as many elements as the trace has operations.
+    """
+
+    def __init__(self, trace, keyframe_interval=None):
+        self.trace = trace
+        self.keyframe_interval = keyframe_interval or max(1024, len(trace.initial))
+        self.arr = array('q', trace.initial)
+        self.position = 0
+        self.highlight = None
+        self._keyframes = {0: array('q', trace.initial)}
+
+    def __len__(self):
+        return len(self.trace)
+
+    def _apply(self, step):
+        op = self.trace.ops[step]
+        i = self.trace.first[step]
+        if op == SWAP:
+            j = self.trace.second[step]
+            self.arr[i], self.arr[j] = self.arr[j], self.arr[i]
+        elif op == WRITE:
+            self.arr[i] = self.trace.second[step]
+        self.highlight = i
+        return op
+
+    def seek(self, step):
+        step = max(0, min(step, len(self.trace)))
+        if step < self.position:
+            base = step - step % self.keyframe_interval
+            while base not in self._keyframes:
+                base -= self.keyframe_interval
+            self.arr = array('q', self._keyframes[base])
+            self.position = base
+            self.highlight = None
+        while self.position < step:
+            self._apply(self.position)
+            self.position += 1
+            if self.position % self.keyframe_interval == 0:
+                self._keyframes.setdefault(self.position, array('q', self.arr))
+        return self.arr
+
+    def step(self, count=1):
+        return self.seek(self.position + count)
+
+    def frames(self, frame_skip=1, include_compares=False):
+        """Yield ``(arr, highlight)`` after every ``frame_skip`` visible operations."""
+        pending = 0
+        while self.position < len(self.trace):
+            op = self._apply(self.position)
+            self.position += 1
+            if self.position % self.keyframe_interval == 0:
+                self._keyframes.setdefault(self.position, array('q', self.arr))
+            if op == COMPARE and not include_compares:
+                continue
+            pending += 1
+            if pending >= frame_skip:
+                pending = 0
+                yield self.arr, self.highlight
+        if pending:
+            yield self.arr, self.highlight
+
+    def play(self, speed=0.1, plot_spot=None, draw_func=None, beep_func=None, frame_skip=1):
+        for arr, highlight in self.frames(frame_skip):
+            visualize_sorting(arr, highlight, speed, plot_spot, draw_func, beep_func)
+        return self.arr
+
+
+class TraceCursor:
+    """Position-only stand-in for a TracePlayer.
+
+    It lets a FrameScheduler pace a trace on a background thread while the
+    array itself is rebuilt by a TracePlayer owned by the consumer, so only
+    step numbers cross the thread boundary.
+    """
+
+    arr = None
+    highlight = None
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.position = 0
+
+    def __len__(self):
+        return len(self.trace)
+
+    def seek(self, step):
+        self.position = max(0, min(step, len(self.trace)))
+        return self.position
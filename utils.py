@@ -1,6 +1,9 @@
-import pandas as pd
-import altair as alt
+import threading
 import time
+import uuid
+
+# Plotting stacks are imported inside the renderers that use them, so
+# importing the sorting core (which needs visualize_sorting) stays cheap
 
 def visualize_sorting(arr, index, speed=0.1, plot_spot=None, draw_func=None, beep_func=None):
     if draw_func is not None:
@@ -11,6 +14,8 @@ def visualize_sorting(arr, index, speed=0.1, plot_spot=None, draw_func=None, bee
 
 # --- Beep sound (optional async JS beep) ---
 def play_beep_async(frequency=440, duration=0.05):
+    import streamlit.components.v1 as components
+
     def _beep():
         beep_script = f"""
         <script>
@@ -23,22 +28,38 @@ def play_beep_async(frequency=440, duration=0.05):
         oscillator.stop(context.currentTime + {duration});
         </script>
         """
-        st.components.v1.html(beep_script, height=0)
+        components.html(beep_script, height=0)
     threading.Thread(target=_beep).start()
 
-# --- Plotting function ---
+# --- Renderers: draw_func(arr, plot_spot, highlight_index), looked up by name ---
+RENDERERS = {}
+
+def register_renderer(name):
+    def decorate(func):
+        RENDERERS[name] = func
+        return func
+    return decorate
+
+def get_renderer(name):
+    return RENDERERS[name]
+
+@register_renderer("Plotly")
 def draw_plotly_bars(arr, plot_spot, highlight_index=None):
+    import plotly.graph_objects as go
+
     colors = ['red' if i == highlight_index else 'blue' for i in range(len(arr))]
     fig = go.Figure(
-        data=[go.Bar(y=arr, marker_color=colors)],
+        data=[go.Bar(y=list(arr), marker_color=colors)],
         layout=go.Layout(height=300, margin=dict(l=0, r=0, t=0, b=0))
     )
     fig.update_layout(xaxis=dict(showticklabels=False), yaxis=dict(showticklabels=False))
     unique_key = str(uuid.uuid4())
     plot_spot.plotly_chart(fig, use_container_width=True, key=unique_key)
 
-
+@register_renderer("Streamlit")
 def draw_streamlit_bars(arr, plot_spot, highlight_index=None):
+    import pandas as pd
+
     # Create DataFrame with color info
     df = pd.DataFrame({
         'value': arr,
@@ -48,7 +69,11 @@ def draw_streamlit_bars(arr, plot_spot, highlight_index=None):
     # Streamlit’s bar_chart can’t directly color individual bars, but for speed it’s great
     plot_spot.bar_chart(df['value'])
 
+@register_renderer("Altair")
 def draw_altair_bars(arr, plot_spot, highlight_index=None):
+    import altair as alt
+    import pandas as pd
+
     df = pd.DataFrame({
         'index': list(range(len(arr))),
         'value': arr,
@@ -65,3 +90,39 @@ def draw_altair_bars(arr, plot_spot, highlight_index=None):
     ).properties(height=300)
 
     plot_spot.altair_chart(chart, use_container_width=True)
+
+def draw_envelope_bars(mins, maxs, plot_spot, highlight_bin=None):
+    # One column per bin: the light bar reaches the bin's maximum, the dark one its minimum
+    import altair as alt
+    import pandas as pd
+
+    df = pd.DataFrame({
+        'index': range(len(maxs)),
+        'max': maxs,
+        'min': mins,
+        'color': ['Highlighted' if i == highlight_bin else 'Normal' for i in range(len(maxs))]
+    })
+    base = alt.Chart(df).encode(x=alt.X('index:O', axis=None))
+    chart = alt.layer(
+        base.mark_bar(color='lightsteelblue').encode(y=alt.Y('max:Q', title='value')),
+        base.mark_bar().encode(
+            y='min:Q',
+            color=alt.Color('color:N',
+                scale=alt.Scale(domain=['Highlighted', 'Normal'], range=['red', 'steelblue']),
+                legend=None
+            )
+        ),
+    ).properties(height=300)
+
+    plot_spot.altair_chart(chart, use_container_width=True)
+
+@register_renderer("Altair (LOD)")
+def draw_lod_bars(arr, plot_spot, highlight_index=None):
+    # Constant payload for any array length: a min/max envelope over lod.BINS columns
+    from lod import bin_edges, envelope
+
+    mins, maxs = envelope(arr)
+    highlight_bin = None
+    if highlight_index is not None:
+        highlight_bin = int(bin_edges(len(arr)).searchsorted(highlight_index, side="right")) - 1
+    draw_envelope_bars(mins, maxs, plot_spot, highlight_bin)